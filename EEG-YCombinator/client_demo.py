@@ -9,49 +9,94 @@ This script demonstrates all the key features of the API:
 
 Run this after starting the API server to see the system in action.
 """
+import asyncio
+import base64
+import aiohttp
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import numpy as np
+import orjson
 import time
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from typing import Dict, Any
+from pathlib import Path
+from functools import lru_cache
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+# Remembers the last discovered server so repeated runs can skip port probing
+URL_CACHE_FILE = Path.home() / ".neuralmon_url"
 
 class NeuralMonitoringClient:
     """Client for interacting with the Neural Monitoring System API"""
     
     def __init__(self, base_url: str = None):
+        # Pooled session with retries so rapid ingestion loops reuse connections
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=20, pool_maxsize=50)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["Connection"] = "keep-alive"
+        
         if base_url is None:
-            # Auto-detect running server by checking for our specific API
-            for port in range(8000, 8010):
-                try:
-                    test_url = f"http://localhost:{port}"
-                    response = requests.get(f"{test_url}/health", timeout=1)
-                    if response.status_code == 200:
-                        health_data = response.json()
-                        # Check if this is our Neural Monitoring System
-                        if ('database' in health_data or 
-                            'service' in health_data and 'Neural' in str(health_data.get('service', ''))):
-                            base_url = test_url
-                            break
-                        # Also try checking if we can access a specific endpoint
-                        try:
-                            patients_response = requests.get(f"{test_url}/patients", timeout=1)
-                            # If patients endpoint exists (even if empty), this is our API
-                            if patients_response.status_code in [200, 422]:  # 422 is validation error, still our API
-                                base_url = test_url
-                                break
-                        except:
-                            pass
-                except:
-                    continue
-            
-            if base_url is None:
-                base_url = "http://localhost:8000"  # fallback
+            base_url = self._discover_server() or "http://localhost:8000"  # fallback
+        
+        # Enable retries only after discovery so closed ports fail fast
+        adapter.max_retries = Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504])
         
         self.base_url = base_url
-        self.session = requests.Session()
         print(f"Connecting to API at: {self.base_url}")
     
+    def _discover_server(self) -> Optional[str]:
+        """Find a running Neural Monitoring System, trying the last known URL first"""
+        try:
+            cached_url = URL_CACHE_FILE.read_text().strip()
+        except OSError:
+            cached_url = None
+        
+        if cached_url and self._probe(cached_url):
+            return cached_url
+        
+        # Probe all candidate ports at once and take the first that answers
+        candidates = [f"http://localhost:{port}" for port in range(8000, 8010)]
+        executor = ThreadPoolExecutor(max_workers=len(candidates))
+        try:
+            futures = [executor.submit(self._probe, url) for url in candidates]
+            for future in as_completed(futures):
+                base_url = future.result()
+                if base_url:
+                    break
+            else:
+                return None
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        try:
+            URL_CACHE_FILE.write_text(base_url)
+        except OSError:
+            pass
+        return base_url
+    
+    def _probe(self, test_url: str) -> Optional[str]:
+        """Return test_url if our API is running there, otherwise None"""
+        try:
+            response = self.session.get(f"{test_url}/health", timeout=1)
+            if response.status_code == 200:
+                health_data = response.json()
+                # Check if this is our Neural Monitoring System
+                if ('database' in health_data or 
+                    'service' in health_data and 'Neural' in str(health_data.get('service', ''))):
+                    return test_url
+                # Also try checking if we can access a specific endpoint
+                patients_response = self.session.get(f"{test_url}/patients", timeout=1)
+                # If patients endpoint exists (even if empty), this is our API
+                if patients_response.status_code in [200, 422]:  # 422 is validation error, still our API
+                    return test_url
+        except Exception:
+            pass
+        return None
+    
     def health_check(self) -> Dict[str, Any]:
         """Check if the API is healthy"""
         response = self.session.get(f"{self.base_url}/health")
@@ -90,14 +135,42 @@ class NeuralMonitoringClient:
         if metadata is None:
             metadata = {}
         
-        data = {
-            "patient_id": patient_id,
-            "timestamp": timestamp,
-            "data": eeg_data.tolist(),
-            "metadata": metadata
+        # Ship raw float32 samples instead of a JSON list of floats
+        samples = np.ascontiguousarray(eeg_data, dtype='<f4')
+        headers = {
+            "Content-Type": "application/octet-stream",
+            "X-Patient-Id": patient_id,
+            "X-Timestamp": timestamp,
+            "X-Channels": str(samples.shape[0]),
+            "X-Samples": str(samples.shape[1]),
+            "X-Metadata": json.dumps(metadata)
         }
         
-        response = self.session.post(f"{self.base_url}/data/ingest", json=data)
+        response = self.session.post(f"{self.base_url}/data/ingest/raw",
+                                     data=samples.tobytes(), headers=headers)
+        response.raise_for_status()
+        return response.json()
+    
+    def ingest_eeg_batch(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Ingest several EEG payloads in one request.
+        
+        Each entry is a dict with patient_id and eeg_data keys, plus optional
+        timestamp and metadata. Returns one result per entry, in order.
+        """
+        items = []
+        for entry in batch:
+            # base64 float32 is ~7x smaller than a JSON list and skips per-value validation
+            samples = np.ascontiguousarray(entry["eeg_data"], dtype='<f4')
+            items.append({
+                "patient_id": entry["patient_id"],
+                "timestamp": entry.get("timestamp") or datetime.utcnow().isoformat(),
+                "data_b64": base64.b64encode(samples.tobytes()).decode(),
+                "channels": samples.shape[0],
+                "metadata": entry.get("metadata") or {}
+            })
+        
+        response = self.session.post(f"{self.base_url}/data/ingest/batch", json={"items": items})
         response.raise_for_status()
         return response.json()
     
@@ -121,6 +194,20 @@ class NeuralMonitoringClient:
         response.raise_for_status()
         return response.json()
     
+    def stream_notifications(self, patient_id: str, clear_buffer: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Stream accumulated notifications one record at a time.
+        
+        Yields each notification, then a final dict holding the summary.
+        """
+        params = {"clear_buffer": clear_buffer}
+        with self.session.get(f"{self.base_url}/data/notifications/{patient_id}/stream",
+                              params=params, stream=True) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line:
+                    yield json.loads(line)
+    
     def compute_statistics(self, patient_id: str, start_time: str, end_time: str, 
                          metrics: list = None) -> Dict[str, Any]:
         """Compute statistics for a patient"""
@@ -146,33 +233,140 @@ class NeuralMonitoringClient:
         response.raise_for_status()
         return response.json()
 
-def generate_mock_eeg_data(channels: int = 21, samples: int = 1280) -> np.ndarray:
-    """Generate realistic mock EEG data"""
-    # Start with random noise
-    data = np.random.randn(channels, samples) * 10
+class AsyncNeuralMonitoringClient:
+    """
+    Asyncio client for the Neural Monitoring System API.
+    
+    Independent calls can be awaited concurrently with asyncio.gather and
+    share one pooled keep-alive connector. Use as an async context manager.
+    """
+    
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=32, keepalive_timeout=30)
+        )
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    async def close(self):
+        """Close the underlying HTTP session"""
+        await self.session.close()
+    
+    async def _request(self, method: str, path: str, **kwargs) -> Any:
+        async with self.session.request(method, f"{self.base_url}{path}", **kwargs) as response:
+            response.raise_for_status()
+            return await response.json()
+    
+    async def get_patient_summary(self, patient_id: str) -> Dict[str, Any]:
+        """Get patient summary with health status"""
+        return await self._request("GET", f"/patients/{patient_id}/summary")
+    
+    async def ingest_eeg_data(self, patient_id: str, eeg_data: np.ndarray,
+                              timestamp: str = None, metadata: Dict = None) -> Dict[str, Any]:
+        """Ingest EEG data for a patient"""
+        if timestamp is None:
+            timestamp = datetime.utcnow().isoformat()
+        
+        if metadata is None:
+            metadata = {}
+        
+        samples = np.ascontiguousarray(eeg_data, dtype='<f4')
+        headers = {
+            "Content-Type": "application/octet-stream",
+            "X-Patient-Id": patient_id,
+            "X-Timestamp": timestamp,
+            "X-Channels": str(samples.shape[0]),
+            "X-Samples": str(samples.shape[1]),
+            "X-Metadata": json.dumps(metadata)
+        }
+        
+        return await self._request("POST", "/data/ingest/raw",
+                                   data=samples.tobytes(), headers=headers)
     
-    # Add realistic EEG patterns
-    t = np.linspace(0, 5, samples)  # 5 seconds at 256 Hz
+    async def get_notifications(self, patient_id: str, clear_buffer: bool = True) -> Dict[str, Any]:
+        """Get accumulated notifications"""
+        params = {"clear_buffer": "true" if clear_buffer else "false"}
+        return await self._request("GET", f"/data/notifications/{patient_id}", params=params)
     
-    for ch in range(channels):
-        # Alpha rhythm (8-13 Hz, prominent in occipital regions)
-        if ch >= 18:  # Back channels
-            alpha = 15 * np.sin(2 * np.pi * 10 * t + np.random.random() * 2 * np.pi)
-            data[ch, :] += alpha
+    async def compute_statistics(self, patient_id: str, start_time: str, end_time: str,
+                                 metrics: list = None) -> Dict[str, Any]:
+        """Compute statistics for a patient"""
+        if metrics is None:
+            metrics = ["adr", "anomalies"]
         
-        # Delta waves (0.5-4 Hz, sleep/anesthesia)
-        delta = 25 * np.sin(2 * np.pi * 2 * t + np.random.random() * 2 * np.pi)
-        data[ch, :] += delta
+        data = {
+            "patient_id": patient_id,
+            "start_time": start_time,
+            "end_time": end_time,
+            "metrics": metrics
+        }
         
-        # Add some beta activity (13-30 Hz)
-        beta = 5 * np.sin(2 * np.pi * 20 * t + np.random.random() * 2 * np.pi)
-        data[ch, :] += beta
+        return await self._request("POST", "/statistics/compute", json=data)
+    
+    async def get_trends(self, patient_id: str, hours: int = 24) -> Dict[str, Any]:
+        """Get patient trends"""
+        return await self._request("GET", f"/statistics/trends/{patient_id}",
+                                   params={"hours": hours})
+
+async def fetch_final_report(base_url: str, patient_id: str) -> list:
+    """Fetch statistics, trends and summary for a patient concurrently"""
+    end_time = datetime.utcnow()
+    start_time = end_time - timedelta(hours=1)
+    
+    async with AsyncNeuralMonitoringClient(base_url) as client:
+        return await asyncio.gather(
+            client.compute_statistics(
+                patient_id=patient_id,
+                start_time=start_time.isoformat(),
+                end_time=end_time.isoformat(),
+                metrics=["adr", "anomalies"]
+            ),
+            client.get_trends(patient_id, hours=1),
+            client.get_patient_summary(patient_id),
+            return_exceptions=True
+        )
+
+# Shared PCG64 generator for mock data (faster than the legacy np.random.* API)
+_rng = np.random.default_rng()
+
+@lru_cache(maxsize=8)
+def _mock_tables(samples: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Angular time bases (2*pi*f*t) for the delta, beta and alpha bands, shape (1, samples)"""
+    t = np.linspace(0, 5, samples, dtype=np.float32)[None, :]  # 5 seconds at 256 Hz
+    tables = (2 * np.pi * 2 * t, 2 * np.pi * 20 * t, 2 * np.pi * 10 * t)
+    for table in tables:
+        table.flags.writeable = False  # shared between calls
+    return tables
+
+def generate_mock_eeg_data(channels: int = 21, samples: int = 1280) -> np.ndarray:
+    """Generate realistic mock EEG data (float32, the dtype the server ingests)"""
+    # Start with random noise
+    data = _rng.standard_normal((channels, samples), dtype=np.float32)
+    data *= 10
+    
+    # Add realistic EEG patterns, one vectorized sin per band across all channels
+    delta_t, beta_t, alpha_t = _mock_tables(samples)
+    delta_phase, beta_phase, alpha_phase = _rng.random((3, channels, 1), dtype=np.float32) * (2 * np.pi)
+    
+    # Delta waves (0.5-4 Hz, sleep/anesthesia)
+    data += 25 * np.sin(delta_t + delta_phase)
+    
+    # Add some beta activity (13-30 Hz)
+    data += 5 * np.sin(beta_t + beta_phase)
+    
+    # Alpha rhythm (8-13 Hz, prominent in occipital regions)
+    if channels > 18:  # Back channels
+        data[18:] += 15 * np.sin(alpha_t + alpha_phase[18:])
     
     # Add some artifacts occasionally
-    if np.random.random() < 0.1:
-        artifact_start = np.random.randint(0, samples - 100)
-        artifact_ch = np.random.randint(0, channels)
-        data[artifact_ch, artifact_start:artifact_start+100] += np.random.randn(100) * 50
+    if _rng.random() < 0.1:
+        artifact_start, artifact_ch = _rng.integers((0, 0), (samples - 100, channels))
+        data[artifact_ch, artifact_start:artifact_start+100] += _rng.standard_normal(100, dtype=np.float32) * 50
     
     return data
 
@@ -185,7 +379,8 @@ def print_section(title: str):
 def print_results(title: str, data: Dict[str, Any]):
     """Pretty print results"""
     print(f"\n{title}:")
-    print(json.dumps(data, indent=2, default=str))
+    print(orjson.dumps(data, default=str,
+                       option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY).decode())
 
 def main():
     """Main demo function"""
@@ -285,20 +480,46 @@ def main():
     
     try:
         # Generate and ingest some test data
-        for i in range(3):
-            eeg_data = generate_mock_eeg_data()
-            result = client.ingest_eeg_data(
+        def ingest(batch: int) -> Dict[str, Any]:
+            return client.ingest_eeg_data(
                 patient_id=patient_id,
-                eeg_data=eeg_data,
-                metadata={"source": "demo_client", "batch": i+1}
+                eeg_data=generate_mock_eeg_data(),
+                metadata={"source": "demo_client", "batch": batch}
             )
-            print(f"✓ Ingested batch {i+1}: {result['anomaly_count']} anomalies, "
-                  f"ADR: {result['adr_mean']:.3f}")
-            time.sleep(1)  # Small delay between batches
+        
+        # Post the batches concurrently over the pooled session; map keeps them in order
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            for i, result in enumerate(executor.map(ingest, range(1, 4)), start=1):
+                print(f"✓ Ingested batch {i}: {result['anomaly_count']} anomalies, "
+                      f"ADR: {result['adr_mean']:.3f}")
             
     except Exception as e:
         print(f"✗ Error ingesting data: {str(e)}")
     
+    # Batch data ingestion
+    print_section("BATCH EEG DATA INGESTION")
+    
+    try:
+        # Send several windows in a single request
+        batch = [
+            {
+                "patient_id": patient_id,
+                "eeg_data": generate_mock_eeg_data(),
+                "metadata": {"source": "demo_client", "window": i+1}
+            }
+            for i in range(5)
+        ]
+        results = client.ingest_eeg_batch(batch)
+        for i, result in enumerate(results):
+            if result['status'] == 'success':
+                print(f"✓ Ingested window {i+1}: {result['anomaly_count']} anomalies, "
+                      f"ADR: {result['adr_mean']:.3f}")
+            else:
+                print(f"✗ Window {i+1} rejected: {result['message']}")
+            
+    except Exception as e:
+        print(f"✗ Error ingesting batch: {str(e)}")
+    
     # Patient summary
     print_section("PATIENT SUMMARY")
     try:
@@ -331,45 +552,36 @@ def main():
     except Exception as e:
         print(f"✗ Error with mock streaming: {str(e)}")
     
+    # Statistics, trends and the final summary are independent - fetch them concurrently
+    stats, trends, summary = asyncio.run(fetch_final_report(client.base_url, patient_id))
+    
     # Statistics computation
     print_section("STATISTICS COMPUTATION")
-    try:
-        # Compute statistics for the last hour
-        end_time = datetime.utcnow()
-        start_time = end_time - timedelta(hours=1)
-        
-        stats = client.compute_statistics(
-            patient_id=patient_id,
-            start_time=start_time.isoformat(),
-            end_time=end_time.isoformat(),
-            metrics=["adr", "anomalies"]
-        )
+    if isinstance(stats, Exception):
+        print(f"✗ Error computing statistics: {str(stats)}")
+    else:
         print_results("Statistics (Last Hour)", stats)
-        
-    except Exception as e:
-        print(f"✗ Error computing statistics: {str(e)}")
     
     # Trends
     print_section("PATIENT TRENDS")
-    try:
-        trends = client.get_trends(patient_id, hours=1)
+    if isinstance(trends, Exception):
+        print(f"✗ Error getting trends: {str(trends)}")
+    else:
         print_results("Recent Trends", trends)
-    except Exception as e:
-        print(f"✗ Error getting trends: {str(e)}")
     
     # Final patient summary
     print_section("FINAL PATIENT STATUS")
-    try:
-        summary = client.get_patient_summary(patient_id)
+    if isinstance(summary, Exception):
+        print(f"✗ Error getting final summary: {str(summary)}")
+    else:
         print_results("Updated Patient Summary", summary)
-    except Exception as e:
-        print(f"✗ Error getting final summary: {str(e)}")
     
     print_section("DEMO COMPLETE")
     print("The Neural Monitoring System demo has completed successfully!")
     print("\nKey features demonstrated:")
     print("✓ Patient registration and management")
     print("✓ Manual EEG data ingestion")
+    print("✓ Batch EEG data ingestion")
     print("✓ Automated mock data streaming")
     print("✓ Real-time anomaly detection")
     print("✓ Alpha/Delta Ratio (ADR) calculation")
@@ -4,18 +4,30 @@ Neural Monitoring System API
 A FastAPI-based system for monitoring patients in stasis during deep-space voyages.
 Provides endpoints for patient registration, EEG data ingestion, and statistical analysis.
 """
+import json
 import logging
+import os
+import socket
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import List, Dict, Any
 import numpy as np
-from fastapi import FastAPI, Depends, HTTPException, BackgroundTasks, status
-from fastapi.responses import JSONResponse
+import orjson
+from fastapi import FastAPI, Depends, HTTPException, BackgroundTasks, Header, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.openapi.utils import get_openapi
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from pydantic.json_schema import models_json_schema
 from sqlalchemy.orm import Session
 from models import (
     get_session_maker, PatientCreate, PatientResponse, PatientSummary,
-    EEGDataIngestion, DataIngestionResponse, StatisticsRequest, StatisticsResponse
+    EEGDataIngestion, EEGBatchIngestion, DataIngestionResponse, StatisticsRequest,
+    StatisticsResponse
 )
-from services import PatientService, DataIngestionService, StatisticsService
+from services import PatientService, DataIngestionService, NotificationBuffer, StatisticsService
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -25,9 +37,32 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Neural Monitoring System",
     description="Deep-space neural monitoring system for stasis patients",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
+class RequestTimeMiddleware:
+    """
+    Stamp each HTTP request with its arrival time as ``request.state.now``.
+    
+    Handlers reuse that value rather than calling datetime.utcnow() for every
+    response field. Plain ASGI so it adds no per-request task or buffering.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            scope.setdefault("state", {})["now"] = datetime.utcnow()
+        await self.app(scope, receive, send)
+
+app.add_middleware(RequestTimeMiddleware)
+
+# Compress larger JSON payloads (patient lists, trends, notifications);
+# small responses are left as-is since gzip overhead outweighs the savings
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Database dependency
 SessionLocal = get_session_maker()
 
@@ -38,28 +73,25 @@ def get_db():
     finally:
         db.close()
 
-# Global data ingestion service (for background processing)
-_data_ingestion_service = None
-
-def get_data_ingestion_service(db: Session = Depends(get_db)) -> DataIngestionService:
-    global _data_ingestion_service
-    if _data_ingestion_service is None:
-        _data_ingestion_service = DataIngestionService(db)
-    return _data_ingestion_service
+# Shared data ingestion service (holds in-memory stream/notification state).
+# Request handlers pass their own DB session into each call.
+@lru_cache(maxsize=1)
+def get_data_ingestion_service() -> DataIngestionService:
+    return DataIngestionService(SessionLocal)
 
 # API Endpoints
 
 @app.get("/", tags=["Health"])
-async def root():
+async def root(request: Request):
     """Health check endpoint"""
     return {
         "message": "Neural Monitoring System is operational",
         "version": "1.0.0",
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": request.state.now.isoformat()
     }
 
 @app.get("/health", tags=["Health"])
-async def health_check(db: Session = Depends(get_db)):
+async def health_check(request: Request, db: Session = Depends(get_db)):
     """Detailed health check"""
     try:
         # Test database connection
@@ -70,16 +102,16 @@ async def health_check(db: Session = Depends(get_db)):
             "service": "Neural Monitoring System",
             "version": "1.0.0",
             "database": "connected",
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": request.state.now.isoformat()
         }
     except Exception as e:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=503,
             content={
                 "status": "unhealthy",
                 "service": "Neural Monitoring System",
                 "error": str(e),
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": request.state.now.isoformat()
             }
         )
 
@@ -99,7 +131,7 @@ async def register_patient(
     try:
         patient_service = PatientService(db)
         patient = patient_service.create_patient(patient_data)
-        return patient
+        return PatientResponse.from_db(patient)
         
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -120,7 +152,7 @@ async def list_patients(
     try:
         patient_service = PatientService(db)
         patients = patient_service.list_patients(active_only=active_only)
-        return patients
+        return [PatientResponse.from_db(patient) for patient in patients]
         
     except Exception as e:
         logger.error(f"Error listing patients: {str(e)}")
@@ -139,7 +171,7 @@ async def get_patient(
         if not patient:
             raise HTTPException(status_code=404, detail=f"Patient {patient_id} not found")
         
-        return patient
+        return PatientResponse.from_db(patient)
         
     except HTTPException:
         raise
@@ -149,6 +181,7 @@ async def get_patient(
 
 @app.get("/patients/{patient_id}/summary", response_model=PatientSummary, tags=["Patients"])
 async def get_patient_summary(
+    request: Request,
     patient_id: str,
     db: Session = Depends(get_db)
 ):
@@ -163,7 +196,7 @@ async def get_patient_summary(
     """
     try:
         patient_service = PatientService(db)
-        summary = patient_service.get_patient_summary(patient_id)
+        summary = patient_service.get_patient_summary(patient_id, now=request.state.now)
         
         if not summary:
             raise HTTPException(status_code=404, detail=f"Patient {patient_id} not found")
@@ -178,10 +211,56 @@ async def get_patient_summary(
 
 # Data Ingestion Endpoints
 
-@app.post("/data/ingest", response_model=DataIngestionResponse, tags=["Data Ingestion"])
+# EEG payloads are large nested float lists. Parsing them with model_validate_json
+# lets pydantic-core validate straight from the bytes, instead of FastAPI's
+# json.loads() into Python objects followed by a second validation walk.
+_JSON_BODY_MODELS = (EEGDataIngestion, EEGBatchIngestion)
+
+async def _parse_json_body(request: Request, model: type[BaseModel]) -> BaseModel:
+    """Validate the raw request body as ``model``, reporting errors like FastAPI does"""
+    try:
+        return model.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+        )
+
+def _json_body_openapi(model: type[BaseModel]) -> Dict[str, Any]:
+    """OpenAPI request body entry for a handler that parses ``model`` itself"""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": {"$ref": f"#/components/schemas/{model.__name__}"}}
+            }
+        }
+    }
+
+def custom_openapi() -> Dict[str, Any]:
+    """Default OpenAPI schema plus the models parsed by _parse_json_body"""
+    if app.openapi_schema is None:
+        schema = get_openapi(
+            title=app.title,
+            version=app.version,
+            description=app.description,
+            routes=app.routes
+        )
+        _, body_schemas = models_json_schema(
+            [(model, "validation") for model in _JSON_BODY_MODELS],
+            ref_template="#/components/schemas/{model}"
+        )
+        schema.setdefault("components", {}).setdefault("schemas", {}).update(body_schemas["$defs"])
+        app.openapi_schema = schema
+    return app.openapi_schema
+
+app.openapi = custom_openapi
+
+@app.post("/data/ingest", response_model=DataIngestionResponse, tags=["Data Ingestion"],
+          openapi_extra=_json_body_openapi(EEGDataIngestion))
 async def ingest_eeg_data(
-    data: EEGDataIngestion,
+    request: Request,
     background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
     ingestion_service: DataIngestionService = Depends(get_data_ingestion_service)
 ):
     """
@@ -195,17 +274,25 @@ async def ingest_eeg_data(
     - **patient_id**: Patient identifier
     - **timestamp**: Data timestamp  
     - **data**: 2D array [channels x samples] - expects 21 EEG channels
+    - **data_b64** / **channels**: Alternative to `data`; base64 little-endian float32
+      samples, row-major, decoded without per-value validation
     - **metadata**: Optional metadata about the recording
     
     The data is processed asynchronously and results stored for statistical analysis.
+    For high-rate ingestion prefer `/data/ingest/raw`, which skips building and
+    validating the nested list of floats.
     """
+    data = await _parse_json_body(request, EEGDataIngestion)
     try:
-        # Convert data to numpy array
-        eeg_data = np.array(data.data, dtype=np.float32)
+        # Convert data to numpy array (already decoded for data_b64 payloads)
+        eeg_data = data.as_array()
         
-        # Process data synchronously for immediate response
+        # Process data synchronously for immediate response, in the threadpool so
+        # the FFT and commit don't block the event loop (and the mock streams on it)
         # In a production system, this might be queued for async processing
-        result = ingestion_service.ingest_data(
+        result = await run_in_threadpool(
+            ingestion_service.ingest_data,
+            db,
             patient_id=data.patient_id,
             timestamp=data.timestamp,
             data=eeg_data,
@@ -228,6 +315,131 @@ async def ingest_eeg_data(
         logger.error(f"Error ingesting EEG data: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to process EEG data")
 
+@app.post("/data/ingest/raw", response_model=DataIngestionResponse, tags=["Data Ingestion"])
+async def ingest_eeg_data_raw(
+    request: Request,
+    x_patient_id: str = Header(..., description="Patient identifier"),
+    x_timestamp: datetime = Header(..., description="Data timestamp (ISO 8601)"),
+    x_channels: int = Header(..., gt=0, description="Number of EEG channels"),
+    x_samples: int = Header(..., gt=0, description="Number of samples per channel"),
+    x_metadata: str = Header(None, description="Optional JSON-encoded metadata"),
+    db: Session = Depends(get_db),
+    ingestion_service: DataIngestionService = Depends(get_data_ingestion_service)
+):
+    """
+    Ingest EEG data sent as a raw binary body.
+    
+    Same processing as `/data/ingest`, but the body is the little-endian
+    float32 samples in row-major [channels x samples] order
+    (`Content-Type: application/octet-stream`), with the shape and patient
+    details carried in `X-*` headers. This avoids building and parsing a
+    large JSON list of floats on both sides.
+    """
+    body = await request.body()
+    
+    expected_bytes = x_channels * x_samples * np.dtype(np.float32).itemsize
+    if len(body) != expected_bytes:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Body has {len(body)} bytes, expected {expected_bytes} for "
+                   f"{x_channels}x{x_samples} float32 samples"
+        )
+    
+    try:
+        metadata = json.loads(x_metadata) if x_metadata else {}
+    except ValueError:
+        raise HTTPException(status_code=400, detail="X-Metadata must be valid JSON")
+    
+    try:
+        # Zero-copy view over the request body
+        eeg_data = np.frombuffer(body, dtype='<f4').reshape(x_channels, x_samples)
+        
+        result = await run_in_threadpool(
+            ingestion_service.ingest_data,
+            db,
+            patient_id=x_patient_id,
+            timestamp=x_timestamp,
+            data=eeg_data,
+            metadata=metadata
+        )
+        
+        return DataIngestionResponse(
+            status="success",
+            message="EEG data processed successfully",
+            patient_id=x_patient_id,
+            timestamp=x_timestamp.isoformat(),
+            samples=eeg_data.shape[1],
+            anomaly_count=result['anomaly_count'],
+            adr_mean=result['adr_mean']
+        )
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error ingesting raw EEG data: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to process EEG data")
+
+@app.post("/data/ingest/batch", response_model=List[DataIngestionResponse], tags=["Data Ingestion"],
+          openapi_extra=_json_body_openapi(EEGBatchIngestion))
+async def ingest_eeg_batch(
+    request: Request,
+    db: Session = Depends(get_db),
+    ingestion_service: DataIngestionService = Depends(get_data_ingestion_service)
+):
+    """
+    Ingest several EEG payloads in a single request.
+    
+    All valid items are processed and stored in one database transaction,
+    amortizing HTTP, JSON and commit overhead across the batch.
+    
+    - **items**: List of EEG payloads, each in the same format as `/data/ingest`
+    
+    Returns one result per item, in request order. Items that fail validation
+    are reported with `status="error"` without affecting the rest of the batch.
+    """
+    batch = await _parse_json_body(request, EEGBatchIngestion)
+    try:
+        items = []
+        shape_errors = {}
+        for i, item in enumerate(batch.items):
+            try:
+                eeg_data = item.as_array()
+            except ValueError as e:
+                shape_errors[i] = str(e)
+                continue
+            items.append({
+                'patient_id': item.patient_id,
+                'timestamp': item.timestamp,
+                'data': eeg_data,
+                'metadata': item.metadata
+            })
+        
+        results = iter(await run_in_threadpool(ingestion_service.ingest_batch, db, items))
+        
+        responses = []
+        for i, item in enumerate(batch.items):
+            if i in shape_errors:
+                result = {'status': 'error', 'message': shape_errors[i], 'samples_processed': 0}
+            else:
+                result = next(results)
+            
+            succeeded = result['status'] == 'success'
+            responses.append(DataIngestionResponse(
+                status=result['status'],
+                message="EEG data processed successfully" if succeeded else result['message'],
+                patient_id=item.patient_id,
+                timestamp=item.timestamp.isoformat(),
+                samples=result['samples_processed'],
+                anomaly_count=result['anomaly_count'] if succeeded else 0,
+                adr_mean=result['adr_mean'] if succeeded else None
+            ))
+        
+        return responses
+        
+    except Exception as e:
+        logger.error(f"Error ingesting EEG batch: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to process EEG batch")
+
 @app.post("/data/stream/start/{patient_id}", tags=["Data Ingestion"])
 async def start_mock_stream(
     patient_id: str,
@@ -236,7 +448,7 @@ async def start_mock_stream(
     """
     Start a mock EEG data stream for testing purposes.
     
-    This creates a background process that generates realistic mock EEG data
+    This creates a background task that generates realistic mock EEG data
     every 5 seconds. Useful for testing the ingestion pipeline and statistics.
     """
     try:
@@ -289,32 +501,63 @@ async def get_notifications(
     - **clear_buffer**: If True, clears the notification buffer after returning data
     """
     try:
-        notifications = ingestion_service.get_accumulated_notifications(
+        notifications = ingestion_service.take_notifications(
             patient_id=patient_id,
             clear_buffer=clear_buffer
         )
         
-        # Calculate summary statistics
-        total_anomalies = sum(n['anomaly_count'] for n in notifications)
-        total_samples = sum(n['total_samples'] for n in notifications)
-        avg_adr = np.mean([n['adr_mean'] for n in notifications]) if notifications else 0
-        
         return {
             "patient_id": patient_id,
             "notification_count": len(notifications),
-            "summary": {
-                "total_anomalies": total_anomalies,
-                "total_samples": total_samples,
-                "anomaly_rate": total_anomalies / total_samples if total_samples > 0 else 0,
-                "average_adr": float(avg_adr)
-            },
-            "notifications": notifications
+            "summary": notifications.summary(),
+            "notifications": notifications.to_records()
         }
         
     except Exception as e:
         logger.error(f"Error getting notifications: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to get notifications")
 
+def _notification_lines(patient_id: str, notifications: NotificationBuffer):
+    """Yield notifications as NDJSON lines, then a final summary line"""
+    for notification in notifications.to_records():
+        yield orjson.dumps(notification) + b"\n"
+    
+    yield orjson.dumps({
+        "patient_id": patient_id,
+        "notification_count": len(notifications),
+        "summary": notifications.summary()
+    }) + b"\n"
+
+@app.get("/data/notifications/{patient_id}/stream", tags=["Data Ingestion"])
+async def stream_notifications(
+    patient_id: str,
+    clear_buffer: bool = True,
+    ingestion_service: DataIngestionService = Depends(get_data_ingestion_service)
+):
+    """
+    Stream accumulated notification data for a patient as NDJSON.
+    
+    Each line is one notification record; the last line carries the
+    patient_id, notification_count and summary.
+    Avoids building the whole response body in memory for busy streams.
+    
+    - **clear_buffer**: If True, clears the notification buffer after returning data
+    """
+    try:
+        notifications = ingestion_service.take_notifications(
+            patient_id=patient_id,
+            clear_buffer=clear_buffer
+        )
+        
+        return StreamingResponse(
+            _notification_lines(patient_id, notifications),
+            media_type="application/x-ndjson"
+        )
+        
+    except Exception as e:
+        logger.error(f"Error streaming notifications: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to stream notifications")
+
 # Statistics Endpoints
 
 @app.post("/statistics/compute", response_model=StatisticsResponse, tags=["Statistics"])
@@ -332,13 +575,7 @@ async def compute_statistics(
     Time range is limited to 7 days maximum for performance.
     """
     try:
-        # Validate time range
-        if (request.end_time - request.start_time).days > 7:
-            raise HTTPException(
-                status_code=400,
-                detail="Time range cannot exceed 7 days"
-            )
-        
+        # Time range (max 7 days) is validated by StatisticsRequest at parse time
         stats_service = StatisticsService(db)
         statistics = stats_service.compute_statistics(
             patient_id=request.patient_id,
@@ -362,8 +599,9 @@ async def compute_statistics(
 
 @app.get("/statistics/trends/{patient_id}", tags=["Statistics"])
 async def get_patient_trends(
+    request: Request,
     patient_id: str,
-    hours: int = 24,
+    hours: int = Query(24, ge=1, le=168, description="Hours to look back (maximum 168 = 7 days)"),
     db: Session = Depends(get_db)
 ):
     """
@@ -374,19 +612,15 @@ async def get_patient_trends(
     Returns trends over the specified time period for visualization.
     """
     try:
-        if hours > 168:  # 7 days
-            raise HTTPException(
-                status_code=400,
-                detail="Hours cannot exceed 168 (7 days)"
-            )
-        
         stats_service = StatisticsService(db)
-        trends = stats_service.get_recent_trends(patient_id=patient_id, hours=hours)
+        trends = stats_service.get_recent_trends(
+            patient_id=patient_id, hours=hours, now=request.state.now
+        )
         
         return {
             "patient_id": patient_id,
             "hours": hours,
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": request.state.now.isoformat(),
             "trends": trends
         }
         
@@ -396,22 +630,34 @@ async def get_patient_trends(
         logger.error(f"Error getting trends: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to get trends")
 
-if __name__ == "__main__":
-    import uvicorn
-    import socket
+def find_free_port(host: str = "0.0.0.0", ports: range = range(8000, 8010)) -> int:
+    """
+    Return the first bindable port in ``ports`` (where the demo client looks),
+    or a kernel-assigned ephemeral port if they are all taken.
     
-    # Find an available port
-    def find_free_port():
-        for port in range(8000, 8010):
+    SO_REUSEADDR mirrors how uvicorn binds, so ports only held by TIME_WAIT
+    connections from a previous run are not skipped.
+    """
+    for port in ports:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             try:
-                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                    s.bind(('localhost', port))
-                    return port
+                s.bind((host, port))
+                return port
             except OSError:
                 continue
-        return 8000  # fallback
+    
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind((host, 0))
+        return s.getsockname()[1]
+
+if __name__ == "__main__":
+    import uvicorn
     
     port = find_free_port()
+    # Mock streams and notification buffers live in process memory, so more
+    # than one worker only suits deployments that don't rely on them
+    workers = int(os.getenv("UVICORN_WORKERS", "1"))
     print(f"Starting server on http://localhost:{port}")
     print(f"API documentation available at: http://localhost:{port}/docs")
-    uvicorn.run(app, host="0.0.0.0", port=port)
\ No newline at end of file
+    uvicorn.run("main:app", host="0.0.0.0", port=port, workers=workers, log_level="info")
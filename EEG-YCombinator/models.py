@@ -2,15 +2,34 @@
 Data models for the Neural Monitoring System
 """
 from datetime import datetime
+from functools import lru_cache
 from typing import Optional, List, Dict, Any
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, JSON, create_engine
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, Index, create_engine, event, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from pydantic import BaseModel, Field
+from sqlalchemy.types import TypeDecorator
+from pydantic import BaseModel, Field, PrivateAttr, model_validator
+import base64
 import json
+import numpy as np
+import orjson
 
 Base = declarative_base()
 
+class OrjsonJSON(TypeDecorator):
+    """JSON column stored as TEXT, (de)serialized with orjson instead of the json module"""
+    impl = Text
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        # OPT_NON_STR_KEYS matches json.dumps' coercion of int/float keys
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+    
+    def process_result_value(self, value, dialect):
+        return orjson.loads(value) if value is not None else None
+
 # SQLAlchemy Models
 class Patient(Base):
     __tablename__ = "patients"
@@ -22,9 +41,9 @@ class Patient(Base):
     stasis_pod_id = Column(String, nullable=False)
     mission_id = Column(String, nullable=False)
     voyage_duration_years = Column(Float, nullable=False)
-    medical_history = Column(JSON, default=dict)
-    baseline_eeg_profile = Column(JSON, default=dict)
-    risk_factors = Column(JSON, default=list)
+    medical_history = Column(OrjsonJSON, default=dict)
+    baseline_eeg_profile = Column(OrjsonJSON, default=dict)
+    risk_factors = Column(OrjsonJSON, default=list)
     stasis_start_time = Column(DateTime, nullable=False)
     is_active = Column(Boolean, default=True)
     last_data_received = Column(DateTime, nullable=True)
@@ -33,9 +52,13 @@ class Patient(Base):
 
 class DataIngestion(Base):
     __tablename__ = "data_ingestions"
+    # Statistics queries filter by patient and range/order by timestamp
+    __table_args__ = (
+        Index("ix_data_patient_ts", "patient_id", "timestamp"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    patient_id = Column(String, nullable=False, index=True)
+    patient_id = Column(String, nullable=False)
     timestamp = Column(DateTime, nullable=False)
     channels = Column(Integer, nullable=False)
     samples = Column(Integer, nullable=False)
@@ -75,6 +98,16 @@ class PatientResponse(BaseModel):
     
     class Config:
         from_attributes = True
+    
+    @classmethod
+    def from_db(cls, patient: "Patient") -> "PatientResponse":
+        """
+        Build a response from a stored Patient row without re-validation.
+        
+        Rows were validated as PatientCreate on the way in, so model_construct
+        is safe here; inbound payloads must still go through validation.
+        """
+        return cls.model_construct(**{name: getattr(patient, name) for name in cls.model_fields})
 
 class PatientSummary(BaseModel):
     patient_id: str
@@ -90,8 +123,37 @@ class PatientSummary(BaseModel):
 class EEGDataIngestion(BaseModel):
     patient_id: str = Field(..., description="Patient identifier")
     timestamp: datetime = Field(..., description="Data timestamp")
-    data: List[List[float]] = Field(..., description="EEG data [channels x samples]")
+    data: Optional[List[List[float]]] = Field(None, description="EEG data [channels x samples]")
+    data_b64: Optional[str] = Field(
+        None,
+        description="Alternative to data: base64 of little-endian float32 samples, row-major [channels x samples]"
+    )
+    channels: int = Field(21, gt=0, description="Number of channels encoded in data_b64")
     metadata: Optional[Dict[str, Any]] = Field(default_factory=dict)
+    
+    # Decoded data_b64 samples, kept so the payload is only decoded once
+    _array: Optional[np.ndarray] = PrivateAttr(default=None)
+    
+    @model_validator(mode="after")
+    def decode_samples(self) -> "EEGDataIngestion":
+        if (self.data is None) == (self.data_b64 is None):
+            raise ValueError("Provide exactly one of data or data_b64")
+        if self.data_b64 is not None:
+            # One decode + memcpy instead of validating every float individually
+            raw = base64.b64decode(self.data_b64, validate=True)
+            if not raw or len(raw) % (4 * self.channels):
+                raise ValueError(f"data_b64 must hold a whole number of float32 samples for {self.channels} channels")
+            self._array = np.frombuffer(raw, dtype='<f4').reshape(self.channels, -1)
+        return self
+    
+    def as_array(self) -> np.ndarray:
+        """EEG samples as a float32 [channels x samples] array"""
+        if self._array is not None:
+            return self._array
+        return np.asarray(self.data, dtype=np.float32)
+
+class EEGBatchIngestion(BaseModel):
+    items: List[EEGDataIngestion] = Field(..., description="EEG payloads to ingest in one transaction")
 
 class DataIngestionResponse(BaseModel):
     status: str
@@ -102,12 +164,22 @@ class DataIngestionResponse(BaseModel):
     anomaly_count: int
     adr_mean: Optional[float]
 
+# Statistics queries are limited to 7 days for performance
+MAX_STATISTICS_RANGE_SECONDS = 7 * 24 * 3600
+
 class StatisticsRequest(BaseModel):
     patient_id: str
     start_time: datetime
     end_time: datetime
     metrics: List[str] = Field(default=["adr", "anomalies"], description="Metrics to compute")
 
+    @model_validator(mode="after")
+    def check_time_range(self) -> "StatisticsRequest":
+        # Full-precision bound; timedelta.days would let e.g. 7d 23h through
+        if (self.end_time - self.start_time).total_seconds() > MAX_STATISTICS_RANGE_SECONDS:
+            raise ValueError("Time range cannot exceed 7 days")
+        return self
+
 class StatisticsResponse(BaseModel):
     patient_id: str
     start_time: datetime
@@ -115,13 +187,43 @@ class StatisticsResponse(BaseModel):
     statistics: Dict[str, Any]
 
 # Database setup
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",      # readers don't block the writer
+    "PRAGMA synchronous=NORMAL",    # safe with WAL, one fsync per checkpoint
+    "PRAGMA cache_size=-65536",     # 64 MB page cache
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",   # 256 MB memory-mapped I/O
+)
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+@lru_cache(maxsize=1)
 def create_database():
-    """Create SQLite database and tables"""
-    engine = create_engine("sqlite:///neural_monitoring.db", echo=False)
+    """Create SQLite database and tables (once per process; the engine owns the pool)"""
+    # Sessions are used from request and worker threads; the default QueuePool
+    # keeps connections (and their pragmas/cache) open between requests
+    engine = create_engine(
+        "sqlite:///neural_monitoring.db",
+        echo=False,
+        connect_args={"check_same_thread": False}
+    )
+    event.listen(engine, "connect", _set_sqlite_pragmas)
     Base.metadata.create_all(bind=engine)
+    
+    # create_all skips existing tables, so bring older databases' indexes up to date;
+    # the composite index also covers lookups by patient_id alone
+    for index in DataIngestion.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX IF EXISTS ix_data_ingestions_patient_id"))
     return engine
 
+@lru_cache(maxsize=1)
 def get_session_maker():
-    """Get SQLAlchemy session maker"""
+    """Get the shared SQLAlchemy session maker, bound to the single engine"""
     engine = create_database()
     return sessionmaker(autocommit=False, autoflush=False, bind=engine)
\ No newline at end of file
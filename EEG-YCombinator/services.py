@@ -1,19 +1,37 @@
 """
 Business logic services for the Neural Monitoring System
 """
+import asyncio
 import logging
+import math
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any, Tuple
+from typing import Callable, Deque, List, Optional, Dict, Any, Tuple
 import numpy as np
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, func, insert, update
 from models import Patient, DataIngestion, PatientCreate, PatientSummary
-from utils import calculate_adr, model_binary_example
+from utils import ADR_WINDOW_SEC, EEG_SFREQ, calculate_adr, model_binary_example
 import threading
 import time
+from collections import deque
 
 logger = logging.getLogger(__name__)
 
+# Mock stream pipeline: bounded queue (back-pressure) drained in batches
+STREAM_QUEUE_SIZE = 128
+STREAM_CONSUMERS = 2
+STREAM_BATCH_SIZE = 32
+
+# PCG64 generator for mock stream data
+_rng = np.random.default_rng()
+
+# Deterministic part of every mock window, shared by all channels and streams:
+# alpha rhythm (~10 Hz) plus some delta activity (~2 Hz) over 5 seconds
+_MOCK_T = np.linspace(0, 5, 1280, dtype=np.float32)
+_MOCK_PATTERN = (10 * np.sin(2 * np.pi * 10 * _MOCK_T) +
+                 20 * np.sin(2 * np.pi * 2 * _MOCK_T)).reshape(1, 1280)
+_MOCK_PATTERN.flags.writeable = False
+
 class PatientService:
     """Service for managing patient operations"""
     
@@ -54,28 +72,35 @@ class PatientService:
     
     def update_last_data_received(self, patient_id: str, timestamp: datetime):
         """Update the last data received timestamp for a patient"""
-        patient = self.get_patient(patient_id)
-        if patient:
-            patient.last_data_received = timestamp
-            self.db.commit()
+        # Single UPDATE; no need to SELECT and hydrate the patient row first
+        self.db.execute(
+            update(Patient)
+            .where(Patient.patient_id == patient_id)
+            .values(last_data_received=timestamp)
+        )
+        self.db.commit()
     
-    def get_patient_summary(self, patient_id: str) -> Optional[PatientSummary]:
-        """Get comprehensive patient summary"""
+    def get_patient_summary(self, patient_id: str,
+                            now: Optional[datetime] = None) -> Optional[PatientSummary]:
+        """Get comprehensive patient summary as of ``now`` (default: current UTC time)"""
         patient = self.get_patient(patient_id)
         if not patient:
             return None
         
+        now = now or datetime.utcnow()
+        
         # Calculate stasis duration
-        stasis_duration = datetime.utcnow() - patient.stasis_start_time
+        stasis_duration = now - patient.stasis_start_time
         stasis_duration_hours = stasis_duration.total_seconds() / 3600
         
         # Get recent statistics
-        recent_stats = self._get_recent_statistics(patient_id)
+        recent_stats = self._get_recent_statistics(patient_id, now)
         
         # Determine health status
         health_status = self._determine_health_status(recent_stats)
         
-        return PatientSummary(
+        # Values come from the DB and our own computations, so skip validation
+        return PatientSummary.model_construct(
             patient_id=patient.patient_id,
             name=patient.name,
             stasis_pod_id=patient.stasis_pod_id,
@@ -87,26 +112,26 @@ class PatientService:
             health_status=health_status
         )
     
-    def _get_recent_statistics(self, patient_id: str) -> Dict[str, Any]:
+    def _get_recent_statistics(self, patient_id: str, now: datetime) -> Dict[str, Any]:
         """Get recent statistics for a patient (last 24 hours)"""
-        cutoff_time = datetime.utcnow() - timedelta(hours=24)
+        cutoff_time = now - timedelta(hours=24)
         
-        recent_data = self.db.query(DataIngestion).filter(
+        data_points, adr_mean, anomaly_count = self.db.query(
+            func.count(DataIngestion.id),
+            func.avg(DataIngestion.adr_mean),
+            func.coalesce(func.sum(DataIngestion.anomaly_count), 0)
+        ).filter(
             DataIngestion.patient_id == patient_id,
             DataIngestion.timestamp >= cutoff_time
-        ).all()
+        ).one()
         
-        if not recent_data:
+        if not data_points:
             return {}
         
-        # Calculate statistics
-        adr_values = [d.adr_mean for d in recent_data if d.adr_mean is not None]
-        anomaly_count = sum(d.anomaly_count for d in recent_data)
-        
         return {
-            'adr_mean': np.mean(adr_values) if adr_values else None,
+            'adr_mean': adr_mean,
             'anomaly_count': anomaly_count,
-            'data_points': len(recent_data)
+            'data_points': data_points
         }
     
     def _determine_health_status(self, stats: Dict[str, Any]) -> str:
@@ -127,31 +152,143 @@ class PatientService:
         else:
             return "normal"
 
+class NotificationBuffer:
+    """
+    Per-patient notification records stored column-wise.
+    
+    Numeric fields live in preallocated NumPy arrays (grown by doubling) with a
+    parallel deque of timestamps, so summaries are single vectorized reductions
+    instead of passes over a list of dicts. The buffer holds at most
+    MAX_RECORDS entries; once full it becomes a ring that drops the oldest
+    record, so an undrained buffer cannot grow without bound.
+    """
+    
+    INITIAL_CAPACITY = 64
+    MAX_RECORDS = 1024
+    
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        capacity = min(capacity, self.MAX_RECORDS)
+        self.timestamps: Deque[datetime] = deque(maxlen=self.MAX_RECORDS)
+        self.adr_mean = np.empty(capacity, dtype=np.float32)
+        self.anomaly_count = np.empty(capacity, dtype=np.int32)
+        self.total_samples = np.empty(capacity, dtype=np.int32)
+        self.size = 0
+        self.start = 0  # index of the oldest record once the ring has wrapped
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def append(self, timestamp: datetime, anomaly_count: int, adr_mean: float,
+               total_samples: int):
+        """Append one record, doubling the arrays when full or overwriting the oldest at MAX_RECORDS"""
+        capacity = len(self.adr_mean)
+        if self.size < capacity:
+            i = self.size
+            self.size += 1
+        elif capacity < self.MAX_RECORDS:
+            self._grow(min(2 * capacity, self.MAX_RECORDS))
+            i = self.size
+            self.size += 1
+        else:
+            i = self.start
+            self.start = (self.start + 1) % capacity
+        
+        self.adr_mean[i] = adr_mean
+        self.anomaly_count[i] = anomaly_count
+        self.total_samples[i] = total_samples
+        self.timestamps.append(timestamp)
+    
+    def _grow(self, capacity: int):
+        # Only reached before the ring wraps, so records are still in order
+        for name in ('adr_mean', 'anomaly_count', 'total_samples'):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+    
+    def _ordered(self, column: np.ndarray) -> np.ndarray:
+        """A column's filled slots, oldest first"""
+        if self.start == 0:
+            return column[:self.size]
+        return np.concatenate((column[self.start:self.size], column[:self.start]))
+    
+    def copy(self) -> "NotificationBuffer":
+        """Independent snapshot of the current records"""
+        snapshot = NotificationBuffer(max(self.size, 1))
+        snapshot.adr_mean[:self.size] = self._ordered(self.adr_mean)
+        snapshot.anomaly_count[:self.size] = self._ordered(self.anomaly_count)
+        snapshot.total_samples[:self.size] = self._ordered(self.total_samples)
+        snapshot.timestamps.extend(self.timestamps)
+        snapshot.size = self.size
+        return snapshot
+    
+    def summary(self) -> Dict[str, Any]:
+        """Totals and averages over all records"""
+        # Order doesn't matter for reductions, so use the filled slots as-is
+        n = self.size
+        total_anomalies = int(self.anomaly_count[:n].sum(dtype=np.int64))
+        total_samples = int(self.total_samples[:n].sum(dtype=np.int64))
+        return {
+            'total_anomalies': total_anomalies,
+            'total_samples': total_samples,
+            'anomaly_rate': total_anomalies / total_samples if total_samples > 0 else 0,
+            'average_adr': float(self.adr_mean[:n].mean()) if n else 0.0
+        }
+    
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Records as a list of dicts (the API's notification shape), oldest first"""
+        return [
+            {
+                'timestamp': timestamp,
+                'anomaly_count': anomaly_count,
+                'adr_mean': adr_mean,
+                'total_samples': total_samples
+            }
+            for timestamp, anomaly_count, adr_mean, total_samples in zip(
+                self.timestamps,
+                self._ordered(self.anomaly_count).tolist(),
+                self._ordered(self.adr_mean).tolist(),
+                self._ordered(self.total_samples).tolist()
+            )
+        ]
+
 class DataIngestionService:
-    """Service for handling EEG data ingestion and processing"""
+    """
+    Service for handling EEG data ingestion and processing.
     
-    def __init__(self, db: Session):
-        self.db = db
-        self.patient_service = PatientService(db)
+    One instance is shared across requests so the in-memory stream and
+    notification state survives between calls. Database sessions are passed
+    in per call, keeping each request in its own transaction scope.
+    """
+    
+    def __init__(self, session_factory: Callable[[], Session]):
+        # Used by background streams, which outlive any single request
+        self.session_factory = session_factory
         # In-memory storage for real-time processing
         self.active_streams: Dict[str, Dict] = {}
-        self.notification_accumulator: Dict[str, List] = {}
+        self.notification_accumulator: Dict[str, NotificationBuffer] = {}
+        # Guards the accumulator against concurrent request and stream threads
+        self._notification_lock = threading.Lock()
+        # Mock stream pipeline, created on first use inside the event loop
+        self._stream_queue: Optional[asyncio.Queue] = None
+        self._stream_consumers: List[asyncio.Task] = []
+        # Mock window buffers handed back by consumers once stored, for reuse.
+        # Only touched from the event loop thread.
+        self._mock_buffers: List[np.ndarray] = []
     
-    def ingest_data(self, patient_id: str, timestamp: datetime, 
+    def ingest_data(self, db: Session, patient_id: str, timestamp: datetime, 
                    data: np.ndarray, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """Process incoming EEG data"""
         try:
+            patient_service = PatientService(db)
+            
             # Validate patient exists
-            patient = self.patient_service.get_patient(patient_id)
+            patient = patient_service.get_patient(patient_id)
             if not patient:
                 raise ValueError(f"Patient {patient_id} not found")
             
             # Validate data format
-            if len(data.shape) != 2:
-                raise ValueError("Data must be 2D array [channels x samples]")
-            
-            if data.shape[0] != 21:
-                raise ValueError("Expected 21 EEG channels")
+            self._validate_eeg_data(data)
             
             # Process data
             processing_results = self._process_eeg_data(data)
@@ -166,11 +303,15 @@ class DataIngestionService:
                 adr_mean=processing_results['adr_mean']
             )
             
-            self.db.add(ingestion)
-            self.db.commit()
-            
-            # Update patient last data received
-            self.patient_service.update_last_data_received(patient_id, timestamp)
+            # Store the record and update patient last data received in one transaction,
+            # reusing the patient row loaded above
+            patient.last_data_received = timestamp
+            db.add(ingestion)
+            try:
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
             
             # Add to notification accumulator
             self._add_to_notification_buffer(patient_id, processing_results)
@@ -190,111 +331,267 @@ class DataIngestionService:
             logger.error(f"Error processing data for patient {patient_id}: {str(e)}")
             raise
     
+    def ingest_batch(self, db: Session, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Process a batch of EEG payloads and store them in a single transaction.
+        
+        Each item is a dict with patient_id, timestamp, data and metadata keys.
+        Items that fail validation are reported with an error status and do not
+        prevent the rest of the batch from being stored. Valid items of the same
+        shape are stacked and processed together.
+        """
+        patient_service = PatientService(db)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        ingestions: List[Dict[str, Any]] = []
+        notifications = []
+        patients: Dict[str, Patient] = {}
+        # Valid item indices grouped by array shape, so each group can be stacked
+        shape_groups: Dict[Tuple[int, ...], List[int]] = {}
+        
+        for index, item in enumerate(items):
+            patient_id = item['patient_id']
+            data = item['data']
+            try:
+                patient = patients.get(patient_id) or patient_service.get_patient(patient_id)
+                if not patient:
+                    raise ValueError(f"Patient {patient_id} not found")
+                patients[patient_id] = patient
+                
+                self._validate_eeg_data(data)
+            except ValueError as e:
+                results[index] = {
+                    'status': 'error',
+                    'message': str(e),
+                    'samples_processed': 0
+                }
+                continue
+            
+            shape_groups.setdefault(data.shape, []).append(index)
+        
+        processed: Dict[int, Dict[str, Any]] = {}
+        for indices in shape_groups.values():
+            stacked = np.stack([items[i]['data'] for i in indices])
+            processed.update(zip(indices, self._process_eeg_batch(stacked)))
+        
+        for index in sorted(processed):
+            item = items[index]
+            patient_id = item['patient_id']
+            data = item['data']
+            processing_results = processed[index]
+            
+            ingestions.append({
+                'patient_id': patient_id,
+                'timestamp': item['timestamp'],
+                'channels': data.shape[0],
+                'samples': data.shape[1],
+                'anomaly_count': processing_results['anomaly_count'],
+                'adr_mean': processing_results['adr_mean']
+            })
+            patients[patient_id].last_data_received = item['timestamp']
+            notifications.append((patient_id, processing_results))
+            
+            results[index] = {
+                'status': 'success',
+                'anomaly_count': processing_results['anomaly_count'],
+                'adr_mean': processing_results['adr_mean'],
+                'samples_processed': data.shape[1]
+            }
+        
+        if ingestions:
+            try:
+                # Bulk INSERT of plain row dicts; no ORM objects to build or track
+                db.execute(insert(DataIngestion), ingestions)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Error storing EEG batch: {str(e)}")
+                raise
+        
+        for patient_id, processing_results in notifications:
+            self._add_to_notification_buffer(patient_id, processing_results)
+        
+        logger.info(f"Processed EEG batch: {len(ingestions)}/{len(items)} items stored")
+        
+        return results
+    
+    def _validate_eeg_data(self, data: np.ndarray):
+        """Validate that EEG data is a [channels x samples] array with 21 channels and one ADR window of samples"""
+        if len(data.shape) != 2:
+            raise ValueError("Data must be 2D array [channels x samples]")
+        
+        if data.shape[0] != 21:
+            raise ValueError("Expected 21 EEG channels")
+        
+        min_samples = int(ADR_WINDOW_SEC * EEG_SFREQ)
+        if data.shape[1] < min_samples:
+            raise ValueError(f"Expected at least {min_samples} samples per channel")
+    
     def _process_eeg_data(self, data: np.ndarray) -> Dict[str, Any]:
         """Process EEG data to extract features and anomalies"""
-        # Calculate ADR (Alpha/Delta Ratio)
-        adr_values = calculate_adr(data)
-        adr_mean = float(np.mean(adr_values))
+        return self._process_eeg_batch(data[np.newaxis])[0]
+    
+    def _process_eeg_batch(self, stacked: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        Process a stack of equally shaped EEG windows, shape (batch, channels, samples).
         
-        # Generate binary anomaly predictions
-        anomaly_mask = model_binary_example(data)
-        anomaly_count = int(np.sum(anomaly_mask))
+        The samples are only read by the ADR computation, which handles the
+        whole stack in one STFT/integration pass; the anomaly model only
+        depends on each window's shape.
+        """
+        # One float32 contiguous view for the STFT (no copy for ingest payloads)
+        stacked = np.ascontiguousarray(stacked, dtype=np.float32)
         
-        return {
-            'adr_mean': adr_mean,
-            'adr_values': adr_values,
-            'anomaly_count': anomaly_count,
-            'anomaly_mask': anomaly_mask,
-            'total_samples': data.shape[1]
-        }
+        # Calculate ADR (Alpha/Delta Ratio)
+        adr_values = calculate_adr(stacked).values
+        adr_means = adr_values.mean(axis=(1, 2)).tolist()
+        
+        results = []
+        for data, adr, adr_mean in zip(stacked, adr_values, adr_means):
+            # Generate binary anomaly predictions
+            anomaly_mask = model_binary_example(data)
+            results.append({
+                'adr_mean': adr_mean,
+                'adr_values': adr,
+                'anomaly_count': int(np.count_nonzero(anomaly_mask)),
+                'anomaly_mask': anomaly_mask,
+                'total_samples': data.shape[1]
+            })
+        return results
     
     def _add_to_notification_buffer(self, patient_id: str, results: Dict[str, Any]):
         """Add processing results to notification buffer"""
-        if patient_id not in self.notification_accumulator:
-            self.notification_accumulator[patient_id] = []
-        
-        self.notification_accumulator[patient_id].append({
-            'timestamp': datetime.utcnow(),
-            'anomaly_count': results['anomaly_count'],
-            'adr_mean': results['adr_mean'],
-            'total_samples': results['total_samples']
-        })
+        with self._notification_lock:
+            buffer = self.notification_accumulator.get(patient_id)
+            if buffer is None:
+                buffer = self.notification_accumulator[patient_id] = NotificationBuffer()
+            
+            buffer.append(
+                timestamp=datetime.utcnow(),
+                anomaly_count=results['anomaly_count'],
+                adr_mean=results['adr_mean'],
+                total_samples=results['total_samples']
+            )
+    
+    def take_notifications(self, patient_id: str,
+                           clear_buffer: bool = True) -> NotificationBuffer:
+        """Get a patient's notification buffer, detaching it if clear_buffer is set"""
+        with self._notification_lock:
+            if clear_buffer:
+                return self.notification_accumulator.pop(patient_id, None) or NotificationBuffer()
+            
+            buffer = self.notification_accumulator.get(patient_id)
+            return buffer.copy() if buffer is not None else NotificationBuffer()
     
     def get_accumulated_notifications(self, patient_id: str, 
                                     clear_buffer: bool = True) -> List[Dict[str, Any]]:
         """Get accumulated notifications for a patient"""
-        notifications = self.notification_accumulator.get(patient_id, [])
-        
-        if clear_buffer and patient_id in self.notification_accumulator:
-            self.notification_accumulator[patient_id] = []
-        
-        return notifications
+        return self.take_notifications(patient_id, clear_buffer).to_records()
     
     def start_mock_stream(self, patient_id: str) -> str:
-        """Start a mock data stream for testing"""
+        """
+        Start a mock data stream for testing.
+        
+        Must be called from the event loop: each stream is a producer task that
+        feeds a shared bounded queue, drained in batches by consumer tasks.
+        """
         if patient_id in self.active_streams:
             raise ValueError(f"Stream already active for patient {patient_id}")
         
+        self._ensure_stream_consumers()
+        
         stream_id = f"stream_{patient_id}_{int(time.time())}"
+        stop = asyncio.Event()
         self.active_streams[patient_id] = {
             'stream_id': stream_id,
-            'active': True,
-            'start_time': datetime.utcnow()
+            'stop': stop,
+            'start_time': datetime.utcnow(),
+            'task': asyncio.get_running_loop().create_task(self._mock_data_producer(patient_id, stop))
         }
         
-        # Start background thread for mock data generation
-        thread = threading.Thread(
-            target=self._mock_data_generator,
-            args=(patient_id,),
-            daemon=True
-        )
-        thread.start()
-        
         logger.info(f"Started mock stream {stream_id} for patient {patient_id}")
         return stream_id
     
     def stop_mock_stream(self, patient_id: str):
         """Stop mock data stream"""
-        if patient_id in self.active_streams:
-            self.active_streams[patient_id]['active'] = False
-            del self.active_streams[patient_id]
+        stream = self.active_streams.pop(patient_id, None)
+        if stream is not None:
+            # Wakes the producer immediately if it is waiting between windows
+            stream['stop'].set()
         
         logger.info(f"Stopped mock stream for patient {patient_id}")
     
-    def _mock_data_generator(self, patient_id: str):
-        """Generate mock EEG data in background thread"""
-        while (patient_id in self.active_streams and 
-               self.active_streams[patient_id]['active']):
-            
-            try:
-                # Generate mock EEG data (21 channels, 1280 samples = 5 seconds at 256 Hz)
-                mock_data = np.random.randn(21, 1280) * 50  # Typical EEG amplitude range
-                
-                # Add some realistic EEG patterns
-                t = np.linspace(0, 5, 1280)  # 5 seconds
-                for ch in range(21):
-                    # Add alpha rhythm (~10 Hz)
-                    alpha = 10 * np.sin(2 * np.pi * 10 * t)
-                    # Add some delta activity (~2 Hz)  
-                    delta = 20 * np.sin(2 * np.pi * 2 * t)
-                    mock_data[ch, :] += alpha + delta
-                
-                # Process the data
-                self.ingest_data(
-                    patient_id=patient_id,
-                    timestamp=datetime.utcnow(),
-                    data=mock_data,
-                    metadata={'source': 'mock_stream'}
-                )
+    def _ensure_stream_consumers(self):
+        """Lazily create the stream queue and its consumer tasks on the running loop"""
+        if self._stream_queue is not None:
+            return
+        
+        self._stream_queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+        loop = asyncio.get_running_loop()
+        self._stream_consumers = [
+            loop.create_task(self._stream_consumer()) for _ in range(STREAM_CONSUMERS)
+        ]
+    
+    def _generate_mock_window(self) -> np.ndarray:
+        """Mock EEG window (21 channels, 1280 samples = 5 seconds at 256 Hz)"""
+        # Reuse a recycled buffer when one is free; queued windows are still in use
+        mock_data = self._mock_buffers.pop() if self._mock_buffers else np.empty((21, 1280), dtype=np.float32)
+        _rng.standard_normal(dtype=np.float32, out=mock_data)
+        mock_data *= 50  # Typical EEG amplitude range
+        mock_data += _MOCK_PATTERN
+        return mock_data
+    
+    async def _mock_data_producer(self, patient_id: str, stop: asyncio.Event):
+        """Generate a mock EEG window every 5 seconds and queue it for ingestion"""
+        try:
+            while not stop.is_set():
+                # Blocks while the queue is full, applying back-pressure
+                await self._stream_queue.put({
+                    'patient_id': patient_id,
+                    'timestamp': datetime.utcnow(),
+                    'data': self._generate_mock_window(),
+                    'metadata': {'source': 'mock_stream'}
+                })
                 
-                # Wait 5 seconds before next chunk
-                time.sleep(5)
+                # Wait 5 seconds before next chunk, or until the stream is stopped
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=5)
+                except asyncio.TimeoutError:
+                    pass
                 
-            except Exception as e:
-                logger.error(f"Error in mock data generator for {patient_id}: {str(e)}")
-                break
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Error in mock data generator for {patient_id}: {str(e)}")
         
         logger.info(f"Mock data generator stopped for patient {patient_id}")
+    
+    async def _stream_consumer(self):
+        """Drain queued mock windows and store them a batch (one commit) at a time"""
+        queue = self._stream_queue
+        while True:
+            items = [await queue.get()]
+            while len(items) < STREAM_BATCH_SIZE and not queue.empty():
+                items.append(queue.get_nowait())
+            
+            try:
+                # DB and NumPy work is blocking, keep it off the event loop
+                await asyncio.to_thread(self._ingest_stream_batch, items)
+            except Exception as e:
+                logger.error(f"Error ingesting mock stream batch: {str(e)}")
+            finally:
+                for item in items:
+                    queue.task_done()
+                    # ingest_batch copies the samples, so the window can be recycled
+                    if len(self._mock_buffers) < STREAM_QUEUE_SIZE:
+                        self._mock_buffers.append(item['data'])
+    
+    def _ingest_stream_batch(self, items: List[Dict[str, Any]]):
+        # Streams outlive any single request, so each batch gets its own session
+        db = self.session_factory()
+        try:
+            self.ingest_batch(db, items)
+        finally:
+            db.close()
 
 class StatisticsService:
     """Service for computing and retrieving patient statistics"""
@@ -305,38 +602,44 @@ class StatisticsService:
     def compute_statistics(self, patient_id: str, start_time: datetime, 
                          end_time: datetime, metrics: List[str]) -> Dict[str, Any]:
         """Compute statistics for a patient over a time range"""
-        # Get data ingestion records
-        data_records = self.db.query(DataIngestion).filter(
+        # Aggregate inside SQLite rather than loading every record
+        (data_points, adr_count, adr_mean, adr_sq_mean, adr_min, adr_max,
+         total_anomalies, total_samples) = self.db.query(
+            func.count(DataIngestion.id),
+            func.count(DataIngestion.adr_mean),
+            func.avg(DataIngestion.adr_mean),
+            func.avg(DataIngestion.adr_mean * DataIngestion.adr_mean),
+            func.min(DataIngestion.adr_mean),
+            func.max(DataIngestion.adr_mean),
+            func.coalesce(func.sum(DataIngestion.anomaly_count), 0),
+            func.coalesce(func.sum(DataIngestion.samples), 0)
+        ).filter(
             DataIngestion.patient_id == patient_id,
             DataIngestion.timestamp >= start_time,
             DataIngestion.timestamp <= end_time
-        ).order_by(DataIngestion.timestamp).all()
+        ).one()
         
-        if not data_records:
+        if not data_points:
             return {'message': 'No data available for the specified time range'}
         
         results = {}
         
-        if 'adr' in metrics:
-            adr_values = [r.adr_mean for r in data_records if r.adr_mean is not None]
-            if adr_values:
-                results['adr'] = {
-                    'mean': float(np.mean(adr_values)),
-                    'std': float(np.std(adr_values)),
-                    'min': float(np.min(adr_values)),
-                    'max': float(np.max(adr_values)),
-                    'count': len(adr_values)
-                }
+        if 'adr' in metrics and adr_count:
+            # Population std from E[x^2] - E[x]^2, clamped against rounding
+            results['adr'] = {
+                'mean': float(adr_mean),
+                'std': math.sqrt(max(adr_sq_mean - adr_mean * adr_mean, 0.0)),
+                'min': float(adr_min),
+                'max': float(adr_max),
+                'count': adr_count
+            }
         
         if 'anomalies' in metrics:
-            total_anomalies = sum(r.anomaly_count for r in data_records)
-            total_samples = sum(r.samples for r in data_records)
-            
             results['anomalies'] = {
                 'total_anomalies': total_anomalies,
                 'total_samples': total_samples,
                 'anomaly_rate': total_anomalies / total_samples if total_samples > 0 else 0,
-                'data_points': len(data_records)
+                'data_points': data_points
             }
         
         results['time_range'] = {
@@ -347,9 +650,10 @@ class StatisticsService:
         
         return results
     
-    def get_recent_trends(self, patient_id: str, hours: int = 24) -> Dict[str, Any]:
-        """Get recent trends for a patient"""
-        end_time = datetime.utcnow()
+    def get_recent_trends(self, patient_id: str, hours: int = 24,
+                          now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Get recent trends for a patient, ending at ``now`` (default: current UTC time)"""
+        end_time = now or datetime.utcnow()
         start_time = end_time - timedelta(hours=hours)
         
         return self.compute_statistics(
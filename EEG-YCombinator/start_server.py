@@ -2,6 +2,7 @@
 """
 Simple server starter with better error handling
 """
+import os
 import sys
 import traceback
 
@@ -9,28 +10,19 @@ def start_server():
     try:
         print("Loading dependencies...")
         import uvicorn
-        import socket
-        from main import app
+        from main import find_free_port
         
         print("Dependencies loaded successfully")
         
-        # Find an available port
-        def find_free_port():
-            for port in range(8000, 8010):
-                try:
-                    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                        s.bind(('localhost', port))
-                        return port
-                except OSError:
-                    continue
-            return 8000  # fallback
-        
         port = find_free_port()
+        # Mock streams and notification buffers live in process memory, so more
+        # than one worker only suits deployments that don't rely on them
+        workers = int(os.getenv("UVICORN_WORKERS", "1"))
         print(f"Starting server on http://localhost:{port}")
         print(f"API documentation available at: http://localhost:{port}/docs")
         
         # Start server
-        uvicorn.run(app, host="0.0.0.0", port=port)
+        uvicorn.run("main:app", host="0.0.0.0", port=port, workers=workers, log_level="info")
         
     except ImportError as e:
         print(f"Import error: {e}")
@@ -4,12 +4,14 @@ Integration Tests for Neural Monitoring System
 This test suite validates all major functionality of the API.
 Run this after starting the server to verify everything works correctly.
 """
+import asyncio
+import base64
 import unittest
 import requests
 import numpy as np
 import time
 from datetime import datetime, timedelta
-from client_demo import NeuralMonitoringClient, generate_mock_eeg_data
+from client_demo import NeuralMonitoringClient, fetch_final_report, generate_mock_eeg_data
 
 class TestNeuralMonitoringSystem(unittest.TestCase):
     """Integration tests for the Neural Monitoring System"""
@@ -216,6 +218,185 @@ class TestNeuralMonitoringSystem(unittest.TestCase):
         self.assertIn('openapi', schema)
         self.assertIn('paths', schema)
 
+    def test_13_batch_ingestion(self):
+        """Test batch EEG data ingestion with per-item results"""
+        # Ensure patient exists
+        self.test_02_patient_registration()
+        
+        batch = [
+            {
+                "patient_id": self.test_patient_id,
+                "eeg_data": generate_mock_eeg_data(channels=21, samples=1280),
+                "metadata": {"test": "batch_ingestion"}
+            },
+            {
+                "patient_id": self.test_patient_id,
+                "eeg_data": np.random.randn(10, 100)  # Wrong number of channels
+            }
+        ]
+        
+        results = self.client.ingest_eeg_batch(batch)
+        
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0]['status'], 'success')
+        self.assertEqual(results[0]['samples'], 1280)
+        self.assertIsInstance(results[0]['adr_mean'], (int, float))
+        self.assertEqual(results[1]['status'], 'error')
+        self.assertIn('21 EEG channels', results[1]['message'])
+
+    def test_14_json_ingestion(self):
+        """Test the JSON ingestion endpoint kept alongside the binary one"""
+        # Ensure patient exists
+        self.test_02_patient_registration()
+        
+        eeg_data = generate_mock_eeg_data(channels=21, samples=1280)
+        response = self.client.session.post(f"{self.client.base_url}/data/ingest", json={
+            "patient_id": self.test_patient_id,
+            "timestamp": datetime.utcnow().isoformat(),
+            "data": eeg_data.tolist(),
+            "metadata": {"test": "json_ingestion"}
+        })
+        
+        self.assertEqual(response.status_code, 200)
+        result = response.json()
+        self.assertEqual(result['status'], 'success')
+        self.assertEqual(result['samples'], 1280)
+    
+    def test_15_raw_ingestion_size_mismatch(self):
+        """Test that a binary body not matching the declared shape is rejected"""
+        response = self.client.session.post(
+            f"{self.client.base_url}/data/ingest/raw",
+            data=np.zeros(100, dtype=np.float32).tobytes(),
+            headers={
+                "Content-Type": "application/octet-stream",
+                "X-Patient-Id": self.test_patient_id,
+                "X-Timestamp": datetime.utcnow().isoformat(),
+                "X-Channels": "21",
+                "X-Samples": "1280"
+            }
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_16_async_client(self):
+        """Test concurrent requests through the asyncio client"""
+        # Ensure patient has data
+        self.test_05_eeg_data_ingestion()
+        
+        stats, trends, summary = asyncio.run(
+            fetch_final_report(self.client.base_url, self.test_patient_id)
+        )
+        
+        self.assertEqual(stats['patient_id'], self.test_patient_id)
+        self.assertEqual(trends['hours'], 1)
+        self.assertIn('health_status', summary)
+
+    def test_17_notification_stream(self):
+        """Test NDJSON notification streaming"""
+        # Ensure there is at least one buffered notification
+        self.test_05_eeg_data_ingestion()
+        
+        records = list(self.client.stream_notifications(self.test_patient_id))
+        
+        self.assertGreaterEqual(len(records), 2)
+        summary = records[-1]
+        self.assertEqual(summary['patient_id'], self.test_patient_id)
+        self.assertEqual(summary['notification_count'], len(records) - 1)
+        self.assertIn('average_adr', summary['summary'])
+        self.assertIn('adr_mean', records[0])
+
+    def test_18_response_compression(self):
+        """Test large responses are gzip-compressed and small ones are not"""
+        response = requests.get(f"{self.client.base_url}/openapi.json",
+                                headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers.get('content-encoding'), 'gzip')
+        self.assertIn('paths', response.json())
+        
+        response = requests.get(f"{self.client.base_url}/health",
+                                headers={"Accept-Encoding": "gzip"})
+        self.assertNotIn('content-encoding', response.headers)
+
+    def test_19_time_range_limits(self):
+        """Test statistics/trends time ranges are bounded to 7 days"""
+        end_time = datetime.utcnow()
+        
+        # Just over 7 days must be rejected, not truncated to 7 by timedelta.days
+        with self.assertRaises(requests.exceptions.HTTPError) as context:
+            self.client.compute_statistics(
+                patient_id=self.test_patient_id,
+                start_time=(end_time - timedelta(days=7, hours=23)).isoformat(),
+                end_time=end_time.isoformat()
+            )
+        self.assertEqual(context.exception.response.status_code, 422)
+        
+        for hours in (0, 169):
+            with self.assertRaises(requests.exceptions.HTTPError) as context:
+                self.client.get_trends(self.test_patient_id, hours=hours)
+            self.assertEqual(context.exception.response.status_code, 422)
+
+    def test_20_batch_mixed_shapes(self):
+        """Test batch results keep request order when window lengths differ"""
+        self.test_02_patient_registration()
+        
+        sample_counts = [1280, 2560, 1280, 2560]
+        batch = [
+            {
+                "patient_id": self.test_patient_id,
+                "eeg_data": generate_mock_eeg_data(channels=21, samples=samples)
+            }
+            for samples in sample_counts
+        ]
+        
+        results = self.client.ingest_eeg_batch(batch)
+        
+        self.assertEqual([r['status'] for r in results], ['success'] * len(sample_counts))
+        self.assertEqual([r['samples'] for r in results], sample_counts)
+
+    def test_21_base64_ingestion(self):
+        """Test JSON ingestion with base64 float32 samples instead of a nested list"""
+        self.test_02_patient_registration()
+        
+        eeg_data = generate_mock_eeg_data(channels=21, samples=1280)
+        payload = {
+            "patient_id": self.test_patient_id,
+            "timestamp": datetime.utcnow().isoformat(),
+            "data_b64": base64.b64encode(eeg_data.astype('<f4').tobytes()).decode(),
+            "channels": 21
+        }
+        response = self.client.session.post(f"{self.client.base_url}/data/ingest", json=payload)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['samples'], 1280)
+        
+        # Truncated payloads and payloads carrying both encodings are rejected
+        for bad in ({"data_b64": payload["data_b64"][:-8]},
+                    {"data": eeg_data.tolist()}):
+            response = self.client.session.post(f"{self.client.base_url}/data/ingest",
+                                                json={**payload, **bad})
+            self.assertEqual(response.status_code, 422)
+
+    def test_22_short_window_rejected(self):
+        """Test windows shorter than one ADR window are rejected, alone or in a batch"""
+        self.test_02_patient_registration()
+        
+        for samples in (0, 10, 511):
+            payload = {
+                "patient_id": self.test_patient_id,
+                "timestamp": datetime.utcnow().isoformat(),
+                "data": [[0.0] * samples] * 21
+            }
+            response = self.client.session.post(f"{self.client.base_url}/data/ingest", json=payload)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('at least 512 samples', response.json()['detail'])
+        
+        results = self.client.ingest_eeg_batch([
+            {"patient_id": self.test_patient_id,
+             "eeg_data": generate_mock_eeg_data(channels=21, samples=1280)},
+            {"patient_id": self.test_patient_id,
+             "eeg_data": np.random.randn(21, 10)}  # Shorter than one window
+        ])
+        self.assertEqual([r['status'] for r in results], ['success', 'error'])
+        self.assertIn('at least 512 samples', results[1]['message'])
+
 def run_integration_tests():
     """Run integration tests with detailed output"""
     print("Neural Monitoring System - Integration Tests")
@@ -5,35 +5,51 @@ Simple test to verify the Neural Monitoring System is working
 import requests
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+def probe(session, url):
+    """Return url if the Neural Monitoring System answers there, otherwise None"""
+    try:
+        response = session.get(f"{url}/health", timeout=2)
+        if response.status_code == 200:
+            data = response.json()
+            if 'Neural Monitoring System' in str(data.get('service', '')):
+                return url
+            print(f"⚠️  Found other service at {url}: {data.get('service', 'Unknown')}")
+    except Exception:
+        pass
+    return None
+
+def find_server(session, ports=range(8000, 8010)):
+    """Return the first URL on localhost where the system answers, or None"""
+    urls = [f"http://localhost:{port}" for port in ports]
+    executor = ThreadPoolExecutor(max_workers=len(urls))
+    try:
+        futures = [executor.submit(probe, session, url) for url in urls]
+        for future in as_completed(futures):
+            if future.result():
+                return future.result()
+        return None
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
 
 def test_server():
     print("Testing Neural Monitoring System...")
     
-    # Test different ports
-    base_url = None
-    for port in range(8000, 8010):
-        try:
-            url = f"http://localhost:{port}"
-            response = requests.get(f"{url}/health", timeout=2)
-            if response.status_code == 200:
-                data = response.json()
-                if 'Neural Monitoring System' in str(data.get('service', '')):
-                    base_url = url
-                    print(f"✅ Found Neural Monitoring System at {url}")
-                    break
-                else:
-                    print(f"⚠️  Found other service at {url}: {data.get('service', 'Unknown')}")
-        except:
-            continue
+    # One keep-alive session for discovery and every endpoint check below
+    session = requests.Session()
     
+    # Probe all ports at once instead of waiting out each timeout in turn
+    base_url = find_server(session)
     if not base_url:
         print("❌ Neural Monitoring System not found on ports 8000-8009")
         print("   Please start the server with: python3 main.py")
         return
+    print(f"✅ Found Neural Monitoring System at {base_url}")
     
     # Test health
     try:
-        response = requests.get(f"{base_url}/health")
+        response = session.get(f"{base_url}/health")
         health = response.json()
         print(f"Health Status: {health.get('status')}")
         print(f"Database: {health.get('database', 'unknown')}")
@@ -53,7 +69,7 @@ def test_server():
             "stasis_start_time": "2024-01-01T00:00:00Z"
         }
         
-        response = requests.post(f"{base_url}/patients", json=patient_data)
+        response = session.post(f"{base_url}/patients", json=patient_data)
         if response.status_code in [201, 400]:  # 201 = created, 400 = already exists
             print("✅ Patient registration endpoint working")
         else:
@@ -67,7 +83,7 @@ def test_server():
     
     # Test patient listing
     try:
-        response = requests.get(f"{base_url}/patients")
+        response = session.get(f"{base_url}/patients")
         if response.status_code == 200:
             patients = response.json()
             print(f"✅ Patient listing working ({len(patients)} patients)")
@@ -80,7 +96,7 @@ def test_server():
     
     # Test API docs
     try:
-        response = requests.get(f"{base_url}/docs")
+        response = session.get(f"{base_url}/docs")
         if response.status_code == 200:
             print("✅ API documentation accessible")
         else:
@@ -1,10 +1,29 @@
+import itertools
+import queue
+import threading
 import time
-from typing import Generator
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Generator, Iterable, TypeVar
 
 import numpy as np
+import scipy.fft
 import scipy.signal
 from scipy.integrate import simpson
 
+# Shared PCG64 generator for mock data
+_rng = np.random.default_rng()
+
+T = TypeVar("T")
+
+# STFT frames transformed per block in calculate_stft_psd
+STFT_BLOCK_FRAMES = 64
+
+# Default ADR analysis window and EEG sampling rate; a recording needs at
+# least one full window of samples
+ADR_WINDOW_SEC = 2.0
+EEG_SFREQ = 256.0
+
 
 def calculate_stft_psd(
     raw_data: np.ndarray,
@@ -18,7 +37,8 @@ def calculate_stft_psd(
     Parameters
     ----------
     raw_data : np.ndarray
-        EEG data, shape (n_channels, n_times).
+        EEG data, shape (n_channels, n_times) or a stack of recordings
+        (..., n_channels, n_times).
     window_sec : float
         Window length in seconds.
     overlap_sec : float
@@ -29,38 +49,112 @@ def calculate_stft_psd(
     Returns
     -------
     psd_results : np.ndarray
-        PSD values, shape (n_channels, n_freqs, n_windows).
+        PSD values |X|^2 / (sfreq * sum(window^2)) as float32, shape
+        (..., n_channels, n_freqs, n_windows).
     freqs : np.ndarray
         Frequency bins, shape (n_freqs,).
+
+    Raises
+    ------
+    ValueError
+        If the recording is shorter than one window.
     """
     window_len_samples = int(window_sec * sfreq)
     overlap_samples = int(overlap_sec * sfreq)
+    step = window_len_samples - overlap_samples
+
+    raw_data = np.asarray(raw_data)
+    if raw_data.shape[-1] < window_len_samples:
+        raise ValueError(
+            f"Need at least {window_len_samples} samples for a {window_sec:g} s window, "
+            f"got {raw_data.shape[-1]}"
+        )
 
-    freqs, _, psd_results = scipy.signal.stft(
-        raw_data,
-        fs=sfreq,
-        nperseg=window_len_samples,
-        noverlap=overlap_samples,
-        axis=1,
-        scaling="psd",
+    # Match scipy.signal.stft defaults: zero-pad half a window on each side
+    # (boundary="zeros") and at the end so the last segment is complete
+    # (padded=True).
+    # Single precision throughout: float32 input is used as is, anything
+    # else is converted once here.
+    raw_data = np.asarray(raw_data, dtype=np.float32)
+    half = window_len_samples // 2
+    n_padded = raw_data.shape[-1] + 2 * half
+    tail = (-(n_padded - window_len_samples) % step) % window_len_samples
+    pad_width = [(0, 0)] * (raw_data.ndim - 1) + [(half, half + tail)]
+    padded = np.pad(raw_data, pad_width)
+
+    # Frame → window → one-sided real FFT; the input is real so the upper
+    # half of a full complex FFT would be redundant.
+    frames = np.lib.stride_tricks.sliding_window_view(
+        padded, window_len_samples, axis=-1
+    )[..., ::step, :]
+    window, scale = _stft_window(window_len_samples, float(sfreq))
+    n_frames = frames.shape[-2]
+    power = np.empty(
+        frames.shape[:-1] + (window_len_samples // 2 + 1,), dtype=np.float32
     )
+    # Work through the frames in blocks so the windowed copy and spectrum of
+    # long recordings stay cache sized instead of spanning the whole signal.
+    for lo in range(0, n_frames, STFT_BLOCK_FRAMES):
+        hi = min(lo + STFT_BLOCK_FRAMES, n_frames)
+        # scipy.fft returns complex64 for float32 frames (numpy.fft's
+        # float32 path is several times slower for these short frames).
+        spectrum = scipy.fft.rfft(frames[..., lo:hi, :] * window, axis=-1)
+        # Squared magnitude directly; no sqrt just to square it again
+        block = power[..., lo:hi, :]
+        np.square(spectrum.real, out=block)
+        block += np.square(spectrum.imag)
+    power *= scale
+
+    freqs = np.fft.rfftfreq(window_len_samples, d=1.0 / sfreq)
+    # (..., n_windows, n_freqs) -> (..., n_freqs, n_windows)
+    return np.swapaxes(power, -1, -2), freqs
 
-    return np.abs(psd_results), freqs
+
+@lru_cache(maxsize=8)
+def _stft_window(window_len_samples: int, sfreq: float) -> tuple[np.ndarray, float]:
+    """Periodic Hann window and the PSD scale factor, cached per shape."""
+    window = scipy.signal.windows.hann(window_len_samples, sym=False)
+    scale = 1.0 / (sfreq * np.sum(window**2))
+    window = window.astype(np.float32)
+    window.flags.writeable = False
+    return window, scale
+
+@dataclass
+class ADRResult:
+    """
+    Alpha/Delta Ratio (ADR) output of calculate_adr.
+
+    Attributes
+    ----------
+    values : np.ndarray
+        ADR values as float32, shape (..., n_channels, n_windows).
+    times : np.ndarray
+        Time of each STFT window in seconds, shape (n_windows,).
+    sfreq : float
+        Sampling frequency the ADR was computed at (Hz).
+    """
+    values: np.ndarray
+    times: np.ndarray
+    sfreq: float
 
 def calculate_adr(
     raw_data: np.ndarray,
-    window_sec: float = 2.0,
+    window_sec: float = ADR_WINDOW_SEC,
     overlap_sec: float = 1.0,
     delta_band: tuple[float, float] = (0.5, 4.0),
     alpha_band: tuple[float, float] = (8.0, 13.0),
-) -> np.ndarray:
+    sfreq: float = EEG_SFREQ,
+) -> ADRResult:
     """
     Calculate Alpha/Delta Ratio (ADR) from EEG data.
 
+    A stack of equally shaped recordings is processed in one STFT/integration
+    pass, which is how batch ingestion uses it.
+
     Parameters
     ----------
     raw_data : np.ndarray
-        EEG data, shape (n_channels, n_times).
+        EEG data, shape (n_channels, n_times) or (..., n_channels, n_times).
     window_sec : float
         Window length in seconds.
     overlap_sec : float
@@ -69,30 +163,58 @@ def calculate_adr(
         Delta band range (Hz).
     alpha_band : tuple[float, float]
         Alpha band range (Hz).
+    sfreq : float, optional
+        Sampling frequency in Hz.
 
     Returns
     -------
-    adr_results : np.ndarray
-        ADR values, shape (n_channels, n_windows).
+    ADRResult
+        ADR values with the time of each window.
     """
     # Compute PSD across windows
-    psd_results, freqs = calculate_stft_psd(raw_data, window_sec, overlap_sec)
-    nwindows = psd_results.shape[2]
+    psd_results, freqs = calculate_stft_psd(raw_data, window_sec, overlap_sec, sfreq)
+    nwindows = psd_results.shape[-1]
     t0 = window_sec
-    window_times = np.arange(nwindows) * (window_sec - overlap_sec) + t0
+    window_times = np.arange(nwindows, dtype=np.float32) * (window_sec - overlap_sec) + t0
     # Integrate band power per channel/window
     epsilon = 1e-14
-    alphaband = np.logical_and(freqs >= alpha_band[0], freqs <= alpha_band[1])
-    deltaband = np.logical_and(freqs >= delta_band[0], freqs <= delta_band[1])
-    # get the PSDs at the relevant slots
-    psda = psd_results[:, alphaband, :]
-    psdd = psd_results[:, deltaband, :]
-    # compute the integrals for the relevant regions
-    alpha_results = simpson(psda, x=freqs[alphaband], axis=1)
-    delta_results = simpson(psdd, x=freqs[deltaband], axis=1)
+    alpha_slice, alpha_weights, delta_slice, delta_weights = _adr_bands(
+        freqs.size, float(freqs[1] - freqs[0]), delta_band, alpha_band
+    )
+    # get the PSDs at the relevant slots (basic slices, so these are views)
+    psda = psd_results[..., alpha_slice, :]
+    psdd = psd_results[..., delta_slice, :]
+    # compute the integrals for the relevant regions: (n_bins,) @ (..., n_bins, n_windows)
+    alpha_results = alpha_weights @ psda
+    delta_results = delta_weights @ psdd
 
     adr_results = alpha_results / (delta_results + epsilon)
-    return adr_results
+    return ADRResult(values=adr_results, times=window_times, sfreq=sfreq)
+
+@lru_cache(maxsize=8)
+def _adr_bands(
+    n_freqs: int,
+    df: float,
+    delta_band: tuple[float, float],
+    alpha_band: tuple[float, float],
+) -> tuple[slice, np.ndarray, slice, np.ndarray]:
+    """
+    Contiguous alpha/delta bin slices and Simpson weights for a STFT grid.
+
+    Simpson's rule is linear in the samples, so integrating the identity
+    matrix once gives per-bin weights; integrating a band then reduces to a
+    dot product with no per-call dispatch or temporaries.
+    """
+    freqs = np.arange(n_freqs) * df
+
+    def band(limits: tuple[float, float]) -> tuple[slice, np.ndarray]:
+        lo = int(np.searchsorted(freqs, limits[0], side="left"))
+        hi = int(np.searchsorted(freqs, limits[1], side="right"))
+        weights = simpson(np.eye(hi - lo), x=freqs[lo:hi], axis=0).astype(np.float32)
+        weights.flags.writeable = False
+        return slice(lo, hi), weights
+
+    return (*band(alpha_band), *band(delta_band))
 
 def model_binary_example(raw_data: np.ndarray) -> np.ndarray:
     """
@@ -106,7 +228,9 @@ def model_binary_example(raw_data: np.ndarray) -> np.ndarray:
     Returns
     -------
     mask : np.ndarray
-        Binary mask, shape (n_channels, n_times).
+        Binary mask, shape (n_channels, n_times). Every channel shares the
+        same row, so this is a read-only broadcast view; copy it if a
+        writable array is needed.
     """
     prevalence = 0.05
     n_channels, n_times = raw_data.shape
@@ -117,18 +241,17 @@ def model_binary_example(raw_data: np.ndarray) -> np.ndarray:
     n_runs = max(1, total_ones // min_run_length)
     run_length = min_run_length
 
-    mask = np.zeros((n_channels, n_times), dtype=np.float32)
-
     # Randomly select start indices for the runs, ensuring they don't overlap
     possible_starts = np.arange(0, n_times - run_length + 1)
     if n_runs > len(possible_starts):
         n_runs = len(possible_starts)
     starts = np.random.choice(possible_starts, size=n_runs, replace=False)
 
-    for start in starts:
-        mask[:, start:start + run_length] = 1.0  # Set same 1s across all channels
+    # Build one row and share it across all channels
+    row = np.zeros(n_times, dtype=np.float32)
+    row[(starts[:, np.newaxis] + np.arange(run_length)).ravel()] = 1.0
 
-    return mask
+    return np.broadcast_to(row, (n_channels, n_times))
 
 
 def mock_timeseries_stream(n_channels: int, chunk_size: int, interval_sec: float = 5.0, dtype: type = np.float32) -> Generator[np.ndarray, None, None]:
@@ -151,11 +274,53 @@ def mock_timeseries_stream(n_channels: int, chunk_size: int, interval_sec: float
     np.ndarray
         Array of shape (n_channels, chunk_size).
     """
+    # Draw straight into float32/float64 rather than generating float64 and casting
+    draw_dtype = dtype if np.dtype(dtype) in (np.float32, np.float64) else np.float64
     while True:
-        data_chunk: np.ndarray = np.random.rand(n_channels, chunk_size).astype(dtype)
+        data_chunk: np.ndarray = _rng.random((n_channels, chunk_size), dtype=draw_dtype)
+        if data_chunk.dtype != dtype:
+            data_chunk = data_chunk.astype(dtype)
         yield data_chunk
         time.sleep(interval_sec)
 
+def prefetch_stream(stream: Iterable[T], maxsize: int = 2) -> Generator[T, None, None]:
+    """
+    Run a stream in a background thread and yield its items from a bounded queue.
+
+    Parameters
+    ----------
+    stream : iterable
+        Source of items; it is consumed entirely in the background thread.
+    maxsize : int
+        Number of items the producer may run ahead of the consumer.
+
+    Yields
+    ------
+    object
+        Items of ``stream`` in order. An exception raised by the stream is
+        re-raised in the consumer.
+    """
+    items: queue.Queue = queue.Queue(maxsize=maxsize)
+    done = object()
+
+    def produce() -> None:
+        try:
+            for item in stream:
+                items.put((item, None))
+        except Exception as exc:
+            items.put((done, exc))
+        else:
+            items.put((done, None))
+
+    threading.Thread(target=produce, daemon=True).start()
+    while True:
+        item, exc = items.get()
+        if item is done:
+            if exc is not None:
+                raise exc
+            return
+        yield item
+
 def notification_service(mask_stream: Generator[np.ndarray, None, None], adr_stream: Generator[np.ndarray, None, None], interval_sec: float = 15) -> None:
     """
     Accumulate mask and ADR outputs, print summary every interval.
@@ -165,30 +330,38 @@ def notification_service(mask_stream: Generator[np.ndarray, None, None], adr_str
     mask_stream : generator
         Yields binary mask arrays.
     adr_stream : generator
-        Yields ADR arrays.
+        Yields ADRResult objects.
     interval_sec : float
         Notification interval (seconds).
     """
-    accumulated = []
-    adr_accumulated = []
+    # The summary only needs totals, so fold each chunk in as it arrives
+    # instead of keeping the chunks around and concatenating them.
+    n_chunks = 0
+    total_ones = 0.0
+    mask_rows = mask_cols = 0
+    adr_sum = 0.0
+    adr_rows = adr_cols = 0
     ct = 0
     start_time = time.time()
     for mask, adr in zip(mask_stream, adr_stream):
-        accumulated.append(mask)
-        adr_accumulated.append(adr)
+        n_chunks += 1
+        total_ones += float(np.sum(mask))
+        mask_rows, mask_cols = mask.shape[0], mask_cols + mask.shape[1]
+        adr_sum += float(np.sum(adr.values))
+        adr_rows, adr_cols = adr.values.shape[0], adr_cols + adr.values.shape[1]
         elapsed = time.time() - start_time
         if elapsed >= interval_sec:
             ct += 1
-            all_masks = np.concatenate(accumulated, axis=1)
-            total_ones = np.sum(all_masks)
-            # ADR summary for this interval
-            all_adr = np.concatenate(adr_accumulated, axis=1)
-            print(f"[Notification] Accumulated {len(accumulated)} mask outputs over {interval_sec} seconds.")
-            print(f"Total number of 1s: {total_ones} out of {all_masks.size} ({total_ones / all_masks.size:.2%})")
-            print(f"Shape of concatenated mask: {all_masks.shape}")
-            print(f"[ADR] Interval {ct}: mean={all_adr.mean():.4f}, shape={all_adr.shape}")
-            accumulated = []
-            adr_accumulated = []
+            mask_size = mask_rows * mask_cols
+            print(f"[Notification] Accumulated {n_chunks} mask outputs over {interval_sec} seconds.")
+            print(f"Total number of 1s: {total_ones} out of {mask_size} ({total_ones / mask_size:.2%})")
+            print(f"Shape of concatenated mask: {(mask_rows, mask_cols)}")
+            print(f"[ADR] Interval {ct}: mean={adr_sum / (adr_rows * adr_cols):.4f}, shape={(adr_rows, adr_cols)}")
+            n_chunks = 0
+            total_ones = 0.0
+            mask_cols = 0
+            adr_sum = 0.0
+            adr_cols = 0
             start_time = time.time()
             if ct >= 5:
                 print("Stopping notification service after 5 intervals.")
@@ -201,7 +374,13 @@ if __name__ == "__main__":
     series_interval_sec = 5.0
     interval_sec = 10.0
 
-    mask_gen = (model_binary_example(raw_data) for raw_data in mock_timeseries_stream(n_channels, chunk_size, interval_sec=series_interval_sec))
-    adr_gen = (calculate_adr(raw_data) for raw_data in mock_timeseries_stream(n_channels, chunk_size, interval_sec=series_interval_sec))
+    # The stream sleeps in one thread and the models run in another, so the
+    # FFT work overlaps the wait for the next chunk. Both models see the
+    # same chunks.
+    chunks = prefetch_stream(mock_timeseries_stream(n_channels, chunk_size, interval_sec=series_interval_sec))
+    results = prefetch_stream((model_binary_example(raw_data), calculate_adr(raw_data)) for raw_data in chunks)
+    mask_results, adr_results = itertools.tee(results, 2)
+    mask_gen = (mask for mask, _ in mask_results)
+    adr_gen = (adr for _, adr in adr_results)
 
     notification_service(mask_gen, adr_gen, interval_sec=interval_sec)
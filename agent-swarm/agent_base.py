@@ -6,19 +6,85 @@ that can work together in swarms without requiring code changes.
 """
 
 import asyncio
+import importlib.util
 import json
 import uuid
+import weakref
+from collections import deque
+from contextvars import ContextVar
 from datetime import datetime
-from typing import Dict, List, Any, Optional
-from abc import ABC, abstractmethod
+from typing import Callable, ClassVar, Deque, Dict, List, Any, Optional
+from abc import ABC
 from pydantic import BaseModel, Field
-from openai import OpenAI
+from openai import AsyncOpenAI
+import httpx
 import os
 from dotenv import load_dotenv
 
+from rate_limiter import get_request_limiter
+from semantic_cache import get_semantic_cache
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder gives the same text
+    orjson = None
+
 # Load environment variables
 load_dotenv()
 
+# Parallel steps and the semantic cache's embedding calls share the pool, so
+# keep plenty of keep-alive connections; fail fast on connect, not on generation.
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+HTTP_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+# With the optional h2 package, concurrent requests share multiplexed HTTP/2
+# connections instead of each opening its own TLS connection
+HTTP2 = importlib.util.find_spec("h2") is not None
+
+# One async client per event loop; the web app runs each task on its own loop
+# in a worker thread, and async connection pools cannot cross loops.
+_openai_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncOpenAI]" = weakref.WeakKeyDictionary()
+
+def get_openai_client() -> AsyncOpenAI:
+    """
+    Return the AsyncOpenAI client for the running event loop.
+
+    All agents on a loop share it, and with it one HTTP connection pool, so
+    keep-alive connections are reused across the whole swarm.
+    """
+    loop = asyncio.get_running_loop()
+    client = _openai_clients.get(loop)
+    if client is None:
+        client = _openai_clients[loop] = AsyncOpenAI(
+            api_key=os.getenv('OPENAI_API_KEY'),
+            # Rate-limited (429) requests are retried with jittered exponential backoff
+            max_retries=int(os.getenv('OPENAI_MAX_RETRIES', 4)),
+            http_client=httpx.AsyncClient(limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT, http2=HTTP2,
+                                          follow_redirects=True)
+        )
+    return client
+
+async def close_openai_client() -> None:
+    """Close the running event loop's client and its pooled connections."""
+    client = _openai_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
+
+# Recent results each agent keeps in memory; totals are counted separately
+RESULTS_KEPT_PER_AGENT = 100
+
+# Characters of each handed-over output included in a semantic cache key
+CACHE_CONTEXT_CHARS = 200
+
+# Set by interactive front ends to receive (agent name, text) as tokens arrive.
+# Model calls made while it is unset wait for the full completion as before.
+stream_handler: ContextVar[Optional[Callable[[str, str], None]]] = ContextVar("stream_handler", default=None)
+
+def _dump_context(context: Dict[str, Any]) -> str:
+    """Serialize inter-agent context as indented JSON for a prompt."""
+    if orjson is not None:
+        return orjson.dumps(context, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(context, indent=2, ensure_ascii=False)
+
 class AgentConfig(BaseModel):
     """
     Configuration model for defining agents through no-code YAML/JSON files.
@@ -32,9 +98,12 @@ class AgentConfig(BaseModel):
     model: str = Field(default="gpt-4o-mini", description="OpenAI model to use")
     temperature: float = Field(default=0.7, description="Response randomness (0-1)")
     max_tokens: int = Field(default=1000, description="Maximum response length")
-    skills: List[str] = Field(default=[], description="List of agent capabilities")
-    dependencies: List[str] = Field(default=[], description="Other agents this agent depends on")
+    skills: List[str] = Field(default_factory=list, description="List of agent capabilities")
+    dependencies: List[str] = Field(default_factory=list, description="Other agents this agent depends on")
     output_format: str = Field(default="text", description="Output format (text, json, markdown)")
+    max_history_messages: int = Field(default=20, ge=2, description="Past messages kept as context besides the system prompt")
+    summarize_history: bool = Field(default=True, description="Summarize messages dropped from the history instead of discarding them")
+    semantic_cache: bool = Field(default=False, description="Reuse responses to near-identical prompts")
 
 class TaskConfig(BaseModel):
     """
@@ -61,8 +130,8 @@ class AgentResult(BaseModel):
     timestamp: datetime = Field(default_factory=datetime.now)
     success: bool
     content: str
-    metadata: Dict[str, Any] = Field(default={})
-    next_steps: List[str] = Field(default=[])
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+    next_steps: List[str] = Field(default_factory=list)
 
 class BaseAgent(ABC):
     """
@@ -75,6 +144,16 @@ class BaseAgent(ABC):
     - Inter-agent communication
     """
 
+    # Fixed per-instance state; agent types add no attributes of their own
+    __slots__ = ("config", "conversation_history", "results", "successful_tasks", "failed_tasks")
+
+    # Fixed role instructions appended to the configured system prompt
+    ROLE_INSTRUCTIONS: ClassVar[str] = ""
+    # Per-task user message; filled with {description}, {context} and {output_format}
+    PROMPT_TEMPLATE: ClassVar[str] = "{description}\n\nContext from other agents: {context}"
+    # Stands in for {context} when no other agent has produced output yet
+    EMPTY_CONTEXT: ClassVar[str] = "None"
+
     def __init__(self, config: AgentConfig):
         """
         Initialize the agent with configuration.
@@ -83,16 +162,25 @@ class BaseAgent(ABC):
             config: AgentConfig object defining agent behavior and capabilities
         """
         self.config = config
-        self.client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
         self.conversation_history: List[Dict[str, str]] = []
-        self.results: List[AgentResult] = []
+        self.results: Deque[AgentResult] = deque(maxlen=RESULTS_KEPT_PER_AGENT)
+        self.successful_tasks = 0
+        self.failed_tasks = 0
 
         # Initialize conversation with system prompt
+        system_prompt = self.config.system_prompt
+        if self.ROLE_INSTRUCTIONS:
+            system_prompt = f"{system_prompt}\n\n{self.ROLE_INSTRUCTIONS}"
         self.conversation_history.append({
             "role": "system",
-            "content": self.config.system_prompt
+            "content": system_prompt
         })
 
+    @property
+    def client(self) -> AsyncOpenAI:
+        """Shared OpenAI client for the event loop the agent is running on."""
+        return get_openai_client()
+
     async def process_task(self, task: TaskConfig, context: Dict[str, Any] = None) -> AgentResult:
         """
         Process a task assigned to this agent.
@@ -110,6 +198,9 @@ class BaseAgent(ABC):
             AgentResult containing the agent's output and metadata
         """
         try:
+            # Keep the prompt sent with each call bounded over long sessions
+            await self._compact_history()
+
             # Add task to conversation history
             task_message = self._prepare_task_message(task, context)
             self.conversation_history.append({"role": "user", "content": task_message})
@@ -117,8 +208,8 @@ class BaseAgent(ABC):
             # Execute the agent's specific processing
             response = await self._execute_task(task, context)
 
-            # Create result object
-            result = AgentResult(
+            # Create result object (fields are already typed, skip validation)
+            result = AgentResult.model_construct(
                 agent_name=self.config.name,
                 task_id=task.id,
                 success=True,
@@ -131,11 +222,12 @@ class BaseAgent(ABC):
             )
 
             self.results.append(result)
+            self.successful_tasks += 1
             return result
 
         except Exception as e:
             # Handle errors gracefully
-            error_result = AgentResult(
+            error_result = AgentResult.model_construct(
                 agent_name=self.config.name,
                 task_id=task.id,
                 success=False,
@@ -144,52 +236,183 @@ class BaseAgent(ABC):
             )
 
             self.results.append(error_result)
+            self.failed_tasks += 1
             return error_result
 
+    async def _compact_history(self) -> None:
+        """
+        Bound the history to config.max_history_messages.
+
+        With summarize_history, the older half of the window is replaced by
+        a single summary message (a checkpoint), so it is compacted only once
+        every few tasks. Otherwise the oldest messages are simply dropped.
+        The system prompt is always kept.
+        """
+        history = self.conversation_history
+        limit = self.config.max_history_messages
+        if len(history) - 1 <= limit:
+            return
+
+        if not self.config.summarize_history:
+            del history[1:self._history_cut(limit)]
+            return
+
+        cut = self._history_cut(limit // 2)
+        try:
+            summary = await self._summarize(history[1:cut])
+        except Exception:
+            # Without a summary, fall back to dropping the messages
+            del history[1:cut]
+            return
+        history[1:cut] = [{"role": "system", "content": f"Summary of the earlier conversation:\n{summary}"}]
+
+    def _history_cut(self, keep: int) -> int:
+        """
+        Index before which messages go so that at most `keep` remain after the system prompt.
+
+        The retained window starts at a user message so no reply is left
+        without its request.
+        """
+        history = self.conversation_history
+        cut = max(1, len(history) - keep)
+        while cut < len(history) and history[cut]["role"] != "user":
+            cut += 1
+        return cut
+
+    async def _summarize(self, messages: List[Dict[str, str]]) -> str:
+        """Condense earlier conversation messages into a short summary."""
+        transcript = "\n\n".join(f"{m['role']}: {m['content']}" for m in messages)
+        async with get_request_limiter():
+            response = await self.client.chat.completions.create(
+                model=self.config.model,
+                messages=[
+                    {"role": "system", "content": "Summarize the following conversation, keeping the facts, "
+                                                  "decisions and open items needed to continue the work."},
+                    {"role": "user", "content": transcript}
+                ],
+                temperature=0,
+                max_tokens=self.config.max_tokens
+            )
+        return response.choices[0].message.content
+
     def _prepare_task_message(self, task: TaskConfig, context: Dict[str, Any] = None) -> str:
         """
         Prepare the task message for the AI model.
 
-        Combines task description with any context from other agents.
+        Names the agents whose output is handed over; the outputs themselves
+        go into the prompt built by _execute_task, so they are sent only once.
         """
-        message = f"Task: {task.name}\n\nDescription: {task.description}\n\n"
+        parts = [f"Task: {task.name}\n\nDescription: {task.description}\n\n"]
 
         if context:
-            message += "Context from other agents:\n"
-            for agent_name, agent_output in context.items():
-                message += f"- {agent_name}: {agent_output}\n"
-            message += "\n"
+            parts.append(f"Context from other agents: {', '.join(context)}\n\n")
 
-        message += f"Please complete this task according to your role as a {self.config.role}."
-        message += f"\nOutput format: {self.config.output_format}"
+        parts.append(f"Please complete this task according to your role as a {self.config.role}.")
+        parts.append(f"\nOutput format: {self.config.output_format}")
 
-        return message
+        return "".join(parts)
 
-    @abstractmethod
     async def _execute_task(self, task: TaskConfig, context: Dict[str, Any] = None) -> str:
         """
-        Abstract method for task execution.
+        Execute the task with the agent's prompt template.
+
+        Agent types customise this through ROLE_INSTRUCTIONS, PROMPT_TEMPLATE
+        and EMPTY_CONTEXT; override it only for different control flow.
+        """
+        prompt = self.PROMPT_TEMPLATE.format(
+            description=task.description,
+            context=_dump_context(context) if context else self.EMPTY_CONTEXT,
+            output_format=self.config.output_format
+        )
+
+        self.conversation_history.append({"role": "user", "content": prompt})
+        cache_key = self._cache_key(task, context) if self.config.semantic_cache else None
+        response = await self._call_openai(self.conversation_history, cache_key)
+
+        # Add response to conversation history for context
+        self.conversation_history.append({"role": "assistant", "content": response})
+
+        return response
+
+    def _cache_partition(self) -> tuple:
+        """
+        Semantic cache partition for this agent.
 
-        Each agent type implements this method differently based on their role.
-        This is where the agent-specific logic goes.
+        Covers everything besides the task that shapes the answer, so agents
+        only share responses when they prompt the same model the same way.
         """
-        pass
+        config = self.config
+        return (config.role, config.model, config.temperature, config.output_format,
+                config.system_prompt, self.ROLE_INSTRUCTIONS)
 
-    async def _call_openai(self, messages: List[Dict[str, str]]) -> str:
+    @staticmethod
+    def _cache_key(task: TaskConfig, context: Dict[str, Any] = None) -> str:
+        """
+        Text that identifies a task for the semantic cache.
+
+        Just the task description and the start of each output handed over,
+        without the prompt template that every task of a role shares.
+        """
+        parts = [task.description]
+        if context:
+            parts.extend(f"{agent_name}: {str(agent_output)[:CACHE_CONTEXT_CHARS]}"
+                         for agent_name, agent_output in context.items())
+        return "\n".join(parts)
+
+    async def _call_openai(self, messages: List[Dict[str, str]], cache_key: Optional[str] = None) -> str:
         """
         Make an API call to OpenAI with proper error handling.
 
         Centralizes OpenAI API calls for consistency and error handling.
+        With semantic_cache enabled, a response to a prompt whose cache_key
+        (by default the latest user message) is nearly identical is reused
+        instead. When a stream_handler is set the completion is streamed and
+        each piece of text is passed to it as it arrives.
         """
+        cache = embedding = None
+        if self.config.semantic_cache:
+            cache = get_semantic_cache()
+            if cache_key is None:
+                cache_key = next((m["content"] for m in reversed(messages) if m["role"] == "user"), None)
+            if cache_key:
+                try:
+                    embedding = await cache.embed(self.client, cache_key)
+                except Exception:
+                    embedding = None  # fall back to an uncached call
+                if embedding is not None:
+                    cached = cache.lookup(self._cache_partition(), embedding)
+                    if cached is not None:
+                        on_token = stream_handler.get()
+                        if on_token is not None:
+                            on_token(self.config.name, cached)
+                        return cached
+
+        on_token = stream_handler.get()
         try:
-            response = self.client.chat.completions.create(
-                model=self.config.model,
-                messages=messages,
-                temperature=self.config.temperature,
-                max_tokens=self.config.max_tokens
-            )
-
-            return response.choices[0].message.content
+            # Awaiting lets other agents' requests run while this one is in flight;
+            # the limiter queues bursts locally instead of running into 429s
+            async with get_request_limiter():
+                response = await self.client.chat.completions.create(
+                    model=self.config.model,
+                    messages=messages,
+                    temperature=self.config.temperature,
+                    max_tokens=self.config.max_tokens,
+                    stream=on_token is not None
+                )
+
+                if on_token is None:
+                    content = response.choices[0].message.content
+                else:
+                    parts = []
+                    async for chunk in response:
+                        delta = chunk.choices[0].delta.content if chunk.choices else None
+                        if delta:
+                            parts.append(delta)
+                            on_token(self.config.name, delta)
+                    content = "".join(parts)
+            if embedding is not None and content:
+                cache.add(self._cache_partition(), embedding, content)
+            return content
 
         except Exception as e:
             raise Exception(f"OpenAI API call failed: {str(e)}")
@@ -200,15 +423,12 @@ class BaseAgent(ABC):
 
         Useful for monitoring swarm performance and debugging.
         """
-        successful_tasks = sum(1 for result in self.results if result.success)
-        failed_tasks = len(self.results) - successful_tasks
-
         return {
             "name": self.config.name,
             "role": self.config.role,
-            "total_tasks": len(self.results),
-            "successful_tasks": successful_tasks,
-            "failed_tasks": failed_tasks,
+            "total_tasks": self.successful_tasks + self.failed_tasks,
+            "successful_tasks": self.successful_tasks,
+            "failed_tasks": self.failed_tasks,
             "skills": self.config.skills,
             "dependencies": self.config.dependencies
         }
@@ -224,4 +444,4 @@ class SwarmMessage(BaseModel):
     message_type: str  # "task_result", "request", "notification"
     content: str
     timestamp: datetime = Field(default_factory=datetime.now)
-    metadata: Dict[str, Any] = Field(default={})
\ No newline at end of file
+    metadata: Dict[str, Any] = Field(default_factory=dict)
\ No newline at end of file
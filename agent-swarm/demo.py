@@ -6,16 +6,20 @@ This demo showcases how multiple AI agents can work together on complex tasks
 using only configuration files - no coding required to create new agents!
 """
 
+import argparse
 import asyncio
 import os
-from rich.console import Console
+from contextlib import contextmanager
+from rich.console import Console, Group
+from rich.live import Live
 from rich.panel import Panel
 from rich.prompt import Prompt, Confirm
 from rich.table import Table
 from rich.progress import Progress, SpinnerColumn, TextColumn
+from typing import Dict, List, Optional
 
 from swarm_orchestrator import SwarmOrchestrator
-from agent_base import TaskConfig, AgentConfig
+from agent_base import TaskConfig, AgentConfig, close_openai_client, get_openai_client, stream_handler
 from agent_types import create_agent
 
 class SwarmDemo:
@@ -26,10 +30,28 @@ class SwarmDemo:
     to complete complex tasks through configuration-driven workflows.
     """
 
-    def __init__(self):
-        """Initialize the demo with console and orchestrator."""
+    def __init__(self, interactive: bool = True, topic: Optional[str] = None):
+        """
+        Initialize the demo with console and orchestrator.
+
+        Args:
+            interactive: Ask for scenario inputs; otherwise their defaults are used
+            topic: Subject used by every scenario instead of asking for one
+        """
         self.console = Console()
         self.orchestrator = SwarmOrchestrator()
+        self.interactive = interactive
+        self.topic = topic
+
+    async def ask(self, question: str, default: str, choices: Optional[List[str]] = None,
+                  subject: bool = False) -> str:
+        """Ask for a scenario input, unless it is given by --topic or prompts are off."""
+        if subject and self.topic:
+            return self.topic
+        if not self.interactive:
+            return default
+        # Read stdin in a worker thread so the event loop keeps running
+        return await asyncio.to_thread(Prompt.ask, question, default=default, choices=choices)
 
     def check_setup(self):
         """
@@ -117,7 +139,7 @@ All agents are defined in simple YAML files - no Python coding required!
         """Demo: Research Report Creation Pipeline"""
         self.console.print(Panel("Research Report Creation Pipeline", style="bold blue"))
 
-        topic = Prompt.ask("What topic would you like to research?", default="artificial intelligence")
+        topic = await self.ask("What topic would you like to research?", default="artificial intelligence", subject=True)
 
         # Create workflow task
         task = self.orchestrator.create_workflow_from_template(
@@ -132,19 +154,22 @@ All agents are defined in simple YAML files - no Python coding required!
         self.console.print(f"\n[bold]Executing workflow:[/bold] {task.name}")
 
         # Execute the task
-        results = await self.orchestrator.execute_task(task)
+        with self.live_output():
+            results = await self.orchestrator.execute_task(task)
 
         # Save and display results
-        filename = self.orchestrator.save_results(task.id, f"research_report_{topic.replace(' ', '_')}.json")
+        filename = await asyncio.to_thread(self.orchestrator.save_results, task.id, f"research_report_{topic.replace(' ', '_')}.json")
 
         self.console.print(Panel("Research Report Completed!", style="bold green"))
         self.show_workflow_results(results)
 
+        return results
+
     async def run_product_launch_demo(self):
         """Demo: Product Launch Planning"""
         self.console.print(Panel("Product Launch Planning Workflow", style="bold blue"))
 
-        product = Prompt.ask("What product are you launching?", default="AI-powered mobile app")
+        product = await self.ask("What product are you launching?", default="AI-powered mobile app", subject=True)
 
         # Create custom workflow for product launch
         workflow = [
@@ -167,29 +192,35 @@ All agents are defined in simple YAML files - no Python coding required!
         self.console.print(f"\n[bold]Executing workflow:[/bold] {task.name}")
 
         # Execute the task
-        results = await self.orchestrator.execute_task(task)
+        with self.live_output():
+            results = await self.orchestrator.execute_task(task)
 
         # Save and display results
-        filename = self.orchestrator.save_results(task.id, f"product_launch_{product.replace(' ', '_')}.json")
+        filename = await asyncio.to_thread(self.orchestrator.save_results, task.id, f"product_launch_{product.replace(' ', '_')}.json")
 
         self.console.print(Panel("Product Launch Plan Completed!", style="bold green"))
         self.show_workflow_results(results)
 
+        return results
+
     async def run_content_marketing_demo(self):
         """Demo: Content Marketing Creation"""
         self.console.print(Panel("Content Marketing Creation Pipeline", style="bold blue"))
 
-        brand = Prompt.ask("What brand/company are you creating content for?", default="TechStartup Inc")
-        content_type = Prompt.ask("What type of content?", default="blog post", choices=["blog post", "social media", "newsletter", "website copy"])
+        brand = await self.ask("What brand/company are you creating content for?", default="TechStartup Inc", subject=True)
+        content_type = await self.ask("What type of content?", default="blog post", choices=["blog post", "social media", "newsletter", "website copy"])
 
-        # Create custom workflow
+        # Create custom workflow; research and strategy are independent and run together
         workflow = [
             {"agent": "research_specialist", "description": "Market research",
-             "instruction": f"Research {brand}'s target audience, competitors, and market trends"},
+             "instruction": f"Research {brand}'s target audience, competitors, and market trends",
+             "depends_on": []},
             {"agent": "creative_innovator", "description": "Content strategy",
-             "instruction": f"Develop creative content angles and messaging strategies for {content_type}"},
+             "instruction": f"Develop creative content angles and messaging strategies for {content_type}",
+             "depends_on": []},
             {"agent": "content_writer", "description": "Create content",
-             "instruction": f"Write engaging {content_type} content for {brand} incorporating research and creative strategy"}
+             "instruction": f"Write engaging {content_type} content for {brand} incorporating research and creative strategy",
+             "depends_on": ["research_specialist", "creative_innovator"]}
         ]
 
         task = TaskConfig(
@@ -200,18 +231,21 @@ All agents are defined in simple YAML files - no Python coding required!
             expected_output=f"Professional {content_type} content ready for publication"
         )
 
-        results = await self.orchestrator.execute_task(task)
-        filename = self.orchestrator.save_results(task.id, f"content_marketing_{brand.replace(' ', '_')}.json")
+        with self.live_output():
+            results = await self.orchestrator.execute_task(task)
+        filename = await asyncio.to_thread(self.orchestrator.save_results, task.id, f"content_marketing_{brand.replace(' ', '_')}.json")
 
         self.console.print(Panel("Content Marketing Completed!", style="bold green"))
         self.show_workflow_results(results)
 
+        return results
+
     async def run_parallel_brainstorm_demo(self):
         """Demo: Parallel Agent Brainstorming"""
         self.console.print(Panel("Parallel Agent Brainstorming Session", style="bold blue"))
 
-        challenge = Prompt.ask("What challenge would you like agents to brainstorm solutions for?",
-                              default="reducing office energy consumption")
+        challenge = await self.ask("What challenge would you like agents to brainstorm solutions for?",
+                                   default="reducing office energy consumption", subject=True)
 
         # Create task for parallel execution
         task = TaskConfig(
@@ -225,13 +259,41 @@ All agents are defined in simple YAML files - no Python coding required!
         self.console.print(f"\n[bold]Running parallel brainstorm:[/bold] {task.name}")
 
         # Execute in parallel mode
-        results = await self.orchestrator.execute_parallel_task(task)
+        with self.live_output():
+            results = await self.orchestrator.execute_parallel_task(task)
 
-        filename = self.orchestrator.save_results(task.id, f"brainstorm_{challenge.replace(' ', '_')}.json")
+        filename = await asyncio.to_thread(self.orchestrator.save_results, task.id, f"brainstorm_{challenge.replace(' ', '_')}.json")
 
         self.console.print(Panel("Brainstorming Session Completed!", style="bold green"))
         self.show_workflow_results(results)
 
+        return results
+
+    async def run_innovation_workshop_demo(self):
+        """Demo: Innovation Workshop"""
+        task = self.orchestrator.create_workflow_from_template("brainstorm_and_analyze",
+                                                             problem=self.topic or "improve team productivity")
+        with self.live_output():
+            results = await self.orchestrator.execute_task(task)
+        await asyncio.to_thread(self.orchestrator.save_results, task.id)
+        self.show_workflow_results(results)
+
+        return results
+
+    async def run_quality_audit_demo(self):
+        """Demo: Quality Audit with all agents"""
+        workflow = [
+            {"agent": "research_specialist", "description": "Gather quality data", "instruction": "Research current quality standards and benchmarks"},
+            {"agent": "data_analyzer", "description": "Analyze quality metrics", "instruction": "Analyze the quality data and identify patterns"},
+            {"agent": "quality_reviewer", "description": "Comprehensive review", "instruction": "Conduct thorough quality assessment and provide recommendations"}
+        ]
+        task = TaskConfig(name="Quality Audit", description="Comprehensive quality review", assigned_agents=["research_specialist", "data_analyzer", "quality_reviewer"], workflow=workflow, expected_output="Quality audit report")
+        with self.live_output():
+            results = await self.orchestrator.execute_task(task)
+        self.show_workflow_results(results)
+
+        return results
+
     async def run_custom_workflow_demo(self):
         """Demo: User-defined custom workflow"""
         self.console.print(Panel("Custom Workflow Creator", style="bold blue"))
@@ -240,8 +302,8 @@ All agents are defined in simple YAML files - no Python coding required!
         self.orchestrator.show_swarm_status()
 
         # Get user input for custom workflow
-        task_name = Prompt.ask("Enter task name", default="Custom Analysis Task")
-        description = Prompt.ask("Enter task description", default="Analyze and provide recommendations")
+        task_name = await asyncio.to_thread(Prompt.ask, "Enter task name", default="Custom Analysis Task")
+        description = await asyncio.to_thread(Prompt.ask, "Enter task description", default="Analyze and provide recommendations")
 
         available_agents = list(self.orchestrator.agents.keys())
         self.console.print(f"\nAvailable agents: {', '.join(available_agents)}")
@@ -251,13 +313,13 @@ All agents are defined in simple YAML files - no Python coding required!
         step_num = 1
 
         while True:
-            agent_name = Prompt.ask(f"Step {step_num} - Choose agent (or 'done' to finish)",
-                                  choices=available_agents + ["done"])
+            agent_name = await asyncio.to_thread(Prompt.ask, f"Step {step_num} - Choose agent (or 'done' to finish)",
+                                                 choices=available_agents + ["done"])
 
             if agent_name == "done":
                 break
 
-            step_description = Prompt.ask(f"What should {agent_name} do in this step?")
+            step_description = await asyncio.to_thread(Prompt.ask, f"What should {agent_name} do in this step?")
             workflow.append({
                 "agent": agent_name,
                 "description": f"Step {step_num}: {step_description}",
@@ -279,12 +341,39 @@ All agents are defined in simple YAML files - no Python coding required!
             expected_output="Custom workflow results"
         )
 
-        results = await self.orchestrator.execute_task(task)
-        filename = self.orchestrator.save_results(task.id, f"custom_workflow.json")
+        with self.live_output():
+            results = await self.orchestrator.execute_task(task)
+        filename = await asyncio.to_thread(self.orchestrator.save_results, task.id, f"custom_workflow.json")
 
         self.console.print(Panel("Custom Workflow Completed!", style="bold green"))
         self.show_workflow_results(results)
 
+        return results
+
+    @contextmanager
+    def live_output(self, tail_lines: int = 15):
+        """
+        Show agent output in a live panel while it is being generated.
+
+        Each agent that is producing text gets its own panel showing the last
+        few lines, so the first tokens appear long before the workflow ends.
+        """
+        outputs = {}
+
+        with Live(console=self.console, refresh_per_second=8, transient=True) as live:
+            def on_token(agent_name: str, text: str):
+                outputs[agent_name] = outputs.get(agent_name, "") + text
+                live.update(Group(*(
+                    Panel("\n".join(output.splitlines()[-tail_lines:]), title=f"{name} (streaming)", style="cyan")
+                    for name, output in outputs.items()
+                )))
+
+            token = stream_handler.set(on_token)
+            try:
+                yield
+            finally:
+                stream_handler.reset(token)
+
     def show_workflow_results(self, results: dict):
         """Display the results of a workflow execution."""
         if not results:
@@ -310,6 +399,15 @@ All agents are defined in simple YAML files - no Python coding required!
         if not await self.load_agents():
             return
 
+        # Create the shared client now rather than inside the first workflow
+        get_openai_client()
+        try:
+            await self._run_menu()
+        finally:
+            await close_openai_client()
+
+    async def _run_menu(self):
+        """Show the scenario menu until the user quits."""
         # Show initial agent status
         self.orchestrator.show_swarm_status()
 
@@ -317,7 +415,7 @@ All agents are defined in simple YAML files - no Python coding required!
             self.console.print("\n" + "="*70)
             self.show_demo_menu()
 
-            choice = Prompt.ask("\nSelect a demo scenario", choices=["1", "2", "3", "4", "5", "6", "7", "8", "quit"])
+            choice = await asyncio.to_thread(Prompt.ask, "\nSelect a demo scenario", choices=["1", "2", "3", "4", "5", "6", "7", "8", "quit"])
 
             if choice == "quit":
                 break
@@ -330,37 +428,72 @@ All agents are defined in simple YAML files - no Python coding required!
             elif choice == "4":
                 await self.run_parallel_brainstorm_demo()
             elif choice == "5":
-                task = self.orchestrator.create_workflow_from_template("brainstorm_and_analyze",
-                                                                     problem="improve team productivity")
-                results = await self.orchestrator.execute_task(task)
-                self.orchestrator.save_results(task.id)
-                self.show_workflow_results(results)
+                await self.run_innovation_workshop_demo()
             elif choice == "6":
-                # Quality audit with all agents
-                workflow = [
-                    {"agent": "research_specialist", "description": "Gather quality data", "instruction": "Research current quality standards and benchmarks"},
-                    {"agent": "data_analyzer", "description": "Analyze quality metrics", "instruction": "Analyze the quality data and identify patterns"},
-                    {"agent": "quality_reviewer", "description": "Comprehensive review", "instruction": "Conduct thorough quality assessment and provide recommendations"}
-                ]
-                task = TaskConfig(name="Quality Audit", description="Comprehensive quality review", assigned_agents=["research_specialist", "data_analyzer", "quality_reviewer"], workflow=workflow, expected_output="Quality audit report")
-                results = await self.orchestrator.execute_task(task)
-                self.show_workflow_results(results)
+                await self.run_quality_audit_demo()
             elif choice == "7":
                 await self.run_custom_workflow_demo()
             elif choice == "8":
                 self.orchestrator.show_swarm_status()
 
             if choice not in ["8", "quit"]:
-                if not Confirm.ask("\nTry another demo scenario?"):
+                if not await asyncio.to_thread(Confirm.ask, "\nTry another demo scenario?"):
                     break
 
         self.console.print("\nThanks for exploring the Agent Swarm system!", style="bold cyan")
         self.console.print("Check the 'outputs' directory for saved results!", style="dim")
 
+    async def run_demo_scenarios(self, scenarios: List[str]) -> Dict[str, dict]:
+        """
+        Run the given scenarios in order without the menu.
+
+        Used for scripted and benchmark runs; combine with interactive=False
+        so nothing waits on stdin.
+
+        Returns:
+            Dictionary mapping each scenario number to its workflow results
+        """
+        if not self.check_setup() or not await self.load_agents():
+            return {}
+
+        get_openai_client()
+        results = {}
+        try:
+            for scenario in scenarios:
+                results[scenario] = await getattr(self, SCENARIOS[scenario])()
+        finally:
+            await close_openai_client()
+
+        return results
+
+# Scenarios that can be run without the menu, by option number
+SCENARIOS = {
+    "1": "run_research_report_demo",
+    "2": "run_product_launch_demo",
+    "3": "run_content_marketing_demo",
+    "4": "run_parallel_brainstorm_demo",
+    "5": "run_innovation_workshop_demo",
+    "6": "run_quality_audit_demo",
+}
+
 def main():
     """Run the agent swarm demo."""
-    demo = SwarmDemo()
-    asyncio.run(demo.run_demo())
+    parser = argparse.ArgumentParser(description="Interactive demo for no-code agent swarms")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS),
+                        help="Run this scenario directly instead of showing the menu (repeatable)")
+    parser.add_argument("--topic", help="Subject to use for the scenarios instead of asking")
+    parser.add_argument("--no-interactive", action="store_true",
+                        help="Use default inputs instead of prompting (requires --scenario)")
+    args = parser.parse_args()
+
+    if args.no_interactive and not args.scenario:
+        parser.error("--no-interactive requires --scenario")
+
+    demo = SwarmDemo(interactive=not args.no_interactive, topic=args.topic)
+    if args.scenario:
+        asyncio.run(demo.run_demo_scenarios(args.scenario))
+    else:
+        asyncio.run(demo.run_demo())
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
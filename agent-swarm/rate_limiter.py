@@ -0,0 +1,75 @@
+"""
+Request limiting for agent model calls
+
+Keeps a swarm's parallel steps under the account's request rate and caps how
+many completions are in flight at once, so bursts are queued locally instead
+of being rejected with 429 responses that cost a full retry delay.
+"""
+
+import asyncio
+import os
+import weakref
+
+class RequestLimiter:
+    """
+    Concurrency cap plus token bucket for requests per minute.
+
+    Use as ``async with limiter:`` around a request. The bucket holds up to
+    max_concurrency tokens, so an idle swarm can start a full parallel step at
+    once and is then held to the sustained rate.
+    """
+
+    def __init__(self, max_concurrency: int = 20, requests_per_minute: float = 500):
+        """
+        Args:
+            max_concurrency: Maximum number of requests in flight at once
+            requests_per_minute: Sustained request rate allowed
+        """
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._rate = requests_per_minute / 60.0
+        self._capacity = float(max_concurrency)
+        self._tokens = self._capacity
+        self._updated = None
+
+    async def __aenter__(self) -> "RequestLimiter":
+        await self._semaphore.acquire()
+        try:
+            await self._take_token()
+        except BaseException:
+            self._semaphore.release()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self._semaphore.release()
+
+    async def _take_token(self) -> None:
+        """Wait until the bucket has a token and take it."""
+        loop = asyncio.get_running_loop()
+        while True:
+            now = loop.time()
+            if self._updated is not None:
+                self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self._rate)
+
+# asyncio primitives belong to one event loop, like the OpenAI client
+_limiters: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, RequestLimiter]" = weakref.WeakKeyDictionary()
+
+def get_request_limiter() -> RequestLimiter:
+    """
+    Return the request limiter for the running event loop.
+
+    Limits come from OPENAI_MAX_CONCURRENCY and OPENAI_REQUESTS_PER_MINUTE.
+    """
+    loop = asyncio.get_running_loop()
+    limiter = _limiters.get(loop)
+    if limiter is None:
+        limiter = _limiters[loop] = RequestLimiter(
+            max_concurrency=int(os.getenv('OPENAI_MAX_CONCURRENCY', 20)),
+            requests_per_minute=float(os.getenv('OPENAI_REQUESTS_PER_MINUTE', 500))
+        )
+    return limiter
@@ -72,6 +72,7 @@ def main():
         print(f"Error importing web app: {e}")
         print("Please install required dependencies:")
         print("pip install flask flask-socketio eventlet")
+        print("Optional, faster event loop on Linux/macOS: pip install uvloop")
         return 1
     except KeyboardInterrupt:
         print("\n\nShutting down GP Swarm...")
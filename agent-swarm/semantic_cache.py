@@ -0,0 +1,91 @@
+"""
+Semantic response cache for agent model calls
+
+Stores model responses next to an embedding of the prompt that produced them,
+so a later prompt that means nearly the same thing can reuse the response
+instead of making another chat completion call.
+"""
+
+import threading
+from functools import lru_cache
+from typing import Dict, Hashable, List, Optional
+
+import numpy as np
+from openai import AsyncOpenAI
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+class _Partition:
+    """Embeddings and responses for one agent prompt setup, evicted least-recently-used."""
+
+    def __init__(self):
+        self.vectors: Optional[np.ndarray] = None
+        self.responses: List[str] = []
+        self.last_used: List[int] = []
+
+class SemanticCache:
+    """
+    Cosine-similarity cache of model responses.
+
+    Entries are kept in separate partitions, one per agent prompt setup
+    (role, model, system prompt, ...), so a response is only reused by an
+    agent that would have been asked the same thing of the same model.
+    Embeddings are unit-normalised, so a matrix-vector product gives the
+    cosine similarity against every cached prompt at once.
+    """
+
+    def __init__(self, threshold: float = 0.95, max_size: int = 1000):
+        """
+        Args:
+            threshold: Minimum cosine similarity for a cached response to be reused
+            max_size: Maximum number of entries kept per partition
+        """
+        self.threshold = threshold
+        self.max_size = max_size
+        self._partitions: Dict[Hashable, _Partition] = {}
+        self._clock = 0
+        self._lock = threading.Lock()
+
+    async def embed(self, client: AsyncOpenAI, text: str) -> np.ndarray:
+        """Return the unit-normalised embedding of text."""
+        response = await client.embeddings.create(model=EMBEDDING_MODEL, input=text)
+        vector = np.asarray(response.data[0].embedding, dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    def lookup(self, partition: Hashable, embedding: np.ndarray) -> Optional[str]:
+        """Return the closest cached response if it is similar enough, otherwise None."""
+        with self._lock:
+            entries = self._partitions.get(partition)
+            if entries is None or entries.vectors is None:
+                return None
+            scores = entries.vectors @ embedding
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                return None
+            self._clock += 1
+            entries.last_used[best] = self._clock
+            return entries.responses[best]
+
+    def add(self, partition: Hashable, embedding: np.ndarray, response: str) -> None:
+        """Cache a response, replacing the least recently used entry when full."""
+        with self._lock:
+            entries = self._partitions.setdefault(partition, _Partition())
+            self._clock += 1
+            if entries.vectors is None:
+                entries.vectors = embedding[np.newaxis, :].copy()
+                entries.responses.append(response)
+                entries.last_used.append(self._clock)
+            elif len(entries.responses) < self.max_size:
+                entries.vectors = np.vstack([entries.vectors, embedding])
+                entries.responses.append(response)
+                entries.last_used.append(self._clock)
+            else:
+                oldest = int(np.argmin(entries.last_used))
+                entries.vectors[oldest] = embedding
+                entries.responses[oldest] = response
+                entries.last_used[oldest] = self._clock
+
+@lru_cache(maxsize=1)
+def get_semantic_cache() -> SemanticCache:
+    """Return the process-wide semantic cache shared by all agents."""
+    return SemanticCache()
@@ -12,23 +12,39 @@ import sys
 import os
 from pathlib import Path
 
-def run_command(command, description):
-    """Run a command and handle errors gracefully."""
+def start_command(command, description):
+    """Start a command in the background; pass the result to finish_command."""
     print(f"🔧 {description}...")
     try:
-        result = subprocess.run(command, shell=True, capture_output=True, text=True)
-        if result.returncode == 0:
+        # An argument list without a shell lets CPython spawn the process with
+        # posix_spawn/vfork instead of forking a /bin/sh that then execs it
+        return subprocess.Popen(command, stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE, text=True)
+    except Exception as e:
+        return e
+
+def finish_command(process, description):
+    """Wait for a command started with start_command and report how it went."""
+    try:
+        if isinstance(process, Exception):
+            raise process
+        _, stderr = process.communicate()
+        if process.returncode == 0:
             print(f"✅ {description} - Success!")
             return True
         else:
             print(f"❌ {description} - Failed!")
-            print(f"Error: {result.stderr}")
+            print(f"Error: {stderr}")
             return False
     except Exception as e:
         print(f"❌ {description} - Failed!")
         print(f"Error: {str(e)}")
         return False
 
+def run_command(command, description):
+    """Run a command and handle errors gracefully."""
+    return finish_command(start_command(command, description), description)
+
 def check_env_file():
     """Check if .env file exists with OpenAI API key."""
     print("🔧 Checking .env file...")
@@ -57,7 +73,7 @@ def main():
     print("=" * 50)
 
     # Step 1: Install dependencies
-    if not run_command("pip install -r requirements.txt", "Installing Python dependencies"):
+    if not run_command([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"], "Installing Python dependencies"):
         print("❌ Setup failed at dependency installation!")
         return False
 
@@ -67,7 +83,7 @@ def main():
         return False
 
     # Step 3: Test basic functionality
-    test_command = '''python3 -c "
+    test_script = '''
 from swarm_orchestrator import SwarmOrchestrator
 import asyncio
 
@@ -77,14 +93,10 @@ async def test():
     print(f'Loaded {len(orchestrator.agents)} agents successfully!')
 
 asyncio.run(test())
-"'''
-
-    if not run_command(test_command, "Testing agent loading"):
-        print("❌ Setup failed at agent loading test!")
-        return False
+'''
 
     # Step 4: Test API connectivity
-    api_test_command = '''python3 -c "
+    api_test_script = '''
 from swarm_orchestrator import SwarmOrchestrator
 from agent_base import TaskConfig
 import asyncio
@@ -111,9 +123,20 @@ async def test_api():
     print(f'API test: {result_text}')
 
 asyncio.run(test_api())
-"'''
+'''
+
+    # Both tests only need the installed packages and .env, so run them together
+    load_test = start_command([sys.executable, "-c", test_script], "Testing agent loading")
+    api_test = start_command([sys.executable, "-c", api_test_script], "Testing OpenAI API connectivity")
+
+    if not finish_command(load_test, "Testing agent loading"):
+        if not isinstance(api_test, Exception):
+            api_test.kill()
+            api_test.wait()
+        print("❌ Setup failed at agent loading test!")
+        return False
 
-    if not run_command(api_test_command, "Testing OpenAI API connectivity"):
+    if not finish_command(api_test, "Testing OpenAI API connectivity"):
         print("❌ Setup failed at API connectivity test!")
         print("Please check your OpenAI API key and internet connection.")
         return False
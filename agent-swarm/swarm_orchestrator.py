@@ -9,7 +9,7 @@ import asyncio
 import json
 import yaml
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 from rich.console import Console
 from rich.table import Table
@@ -17,9 +17,70 @@ from rich.panel import Panel
 from rich.progress import Progress, TaskID
 from rich.live import Live
 
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as YamlLoader
+
+try:
+    import orjson
+except ImportError:  # optional; falls back to the stdlib encoder
+    orjson = None
+
 from agent_base import BaseAgent, AgentConfig, TaskConfig, AgentResult, SwarmMessage
 from agent_types import create_agent
 
+# Parsed config files by path, with the (mtime, size) they were parsed at, so
+# reloading the same configs skips parsing until a file is edited
+_config_cache: Dict[str, Tuple[int, int, Dict[str, Any]]] = {}
+
+# Reusable workflow patterns for create_workflow_from_template. Instructions
+# are format strings filled from the caller's kwargs, falling back to defaults.
+WORKFLOW_TEMPLATES: Dict[str, Dict[str, Any]] = {
+    "research_and_write": {
+        "defaults": {"topic": "the assigned topic", "content_type": "article"},
+        "steps": [
+            {"agent": "researcher", "description": "Research the topic",
+             "instruction": "Research {topic} thoroughly"},
+            {"agent": "writer", "description": "Create content based on research",
+             "instruction": "Write a {content_type} based on the research"},
+            {"agent": "reviewer", "description": "Review and improve the content",
+             "instruction": "Review the content for quality and suggest improvements"}
+        ]
+    },
+
+    "brainstorm_and_analyze": {
+        "defaults": {"problem": "the given problem"},
+        "steps": [
+            {"agent": "creative", "description": "Generate creative ideas",
+             "instruction": "Brainstorm creative solutions for {problem}"},
+            {"agent": "analyzer", "description": "Analyze the feasibility of ideas",
+             "instruction": "Analyze the proposed ideas for feasibility and potential impact"},
+            {"agent": "coordinator", "description": "Create implementation plan",
+             "instruction": "Create a plan to implement the best ideas",
+             "depends_on": ("creative", "analyzer")}
+        ]
+    },
+
+    "content_pipeline": {
+        "defaults": {"topic": "the topic", "content_type": "content"},
+        "steps": [
+            {"agent": "researcher", "description": "Gather information",
+             "instruction": "Research {topic} and gather relevant information",
+             "depends_on": ()},
+            {"agent": "creative", "description": "Generate content ideas",
+             "instruction": "Generate creative angles and approaches for the content",
+             "depends_on": ()},
+            {"agent": "writer", "description": "Create the content",
+             "instruction": "Write engaging {content_type} incorporating the research and creative ideas",
+             "depends_on": ("researcher", "creative")},
+            {"agent": "reviewer", "description": "Final review and polish",
+             "instruction": "Review, edit, and polish the content for publication",
+             "depends_on": ("writer",)}
+        ]
+    }
+}
+
 class SwarmOrchestrator:
     """
     Central coordinator for managing agent swarms.
@@ -32,16 +93,21 @@ class SwarmOrchestrator:
     - Workflow execution
     """
 
-    def __init__(self):
+    def __init__(self, max_stored_tasks: int = 100):
         """
         Initialize the swarm orchestrator.
 
         Sets up the management infrastructure for coordinating multiple agents
         working together on complex tasks.
+
+        Args:
+            max_stored_tasks: Number of most recent tasks whose results are kept
+                in memory for save_results; older ones are dropped
         """
         self.agents: Dict[str, BaseAgent] = {}
         self.tasks: Dict[str, TaskConfig] = {}
         self.results: Dict[str, List[AgentResult]] = {}
+        self.max_stored_tasks = max_stored_tasks
         self.messages: List[SwarmMessage] = []
         self.console = Console()
 
@@ -71,18 +137,17 @@ class SwarmOrchestrator:
             self.console.print(f"[yellow]No configuration files found in '{config_dir}'[/yellow]")
             return
 
-        for config_file in config_files:
-            try:
-                # Load configuration based on file type
-                if config_file.suffix.lower() in ['.yaml', '.yml']:
-                    with open(config_file, 'r') as f:
-                        config_data = yaml.safe_load(f)
-                else:  # JSON
-                    with open(config_file, 'r') as f:
-                        config_data = json.load(f)
+        # Read and parse all files concurrently in worker threads
+        configs = await asyncio.gather(
+            *(asyncio.to_thread(self._read_agent_config, config_file) for config_file in config_files),
+            return_exceptions=True
+        )
 
-                # Create agent configuration
-                agent_config = AgentConfig(**config_data)
+        # Register in file order so duplicate names resolve as before
+        for config_file, agent_config in zip(config_files, configs):
+            try:
+                if isinstance(agent_config, Exception):
+                    raise agent_config
 
                 # Create and register the agent
                 agent = create_agent(agent_config)
@@ -93,6 +158,26 @@ class SwarmOrchestrator:
             except Exception as e:
                 self.console.print(f"[red]Error loading {config_file}: {str(e)}[/red]")
 
+    @staticmethod
+    def _read_agent_config(config_file: Path) -> AgentConfig:
+        """Parse one YAML/JSON agent configuration file, reusing an earlier parse if unchanged."""
+        stat = config_file.stat()
+        cached = _config_cache.get(str(config_file))
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            config_data = cached[2]
+        else:
+            # Load configuration based on file type
+            if config_file.suffix.lower() in ['.yaml', '.yml']:
+                with open(config_file, 'r') as f:
+                    config_data = yaml.load(f, Loader=YamlLoader)
+            else:  # JSON
+                with open(config_file, 'r') as f:
+                    config_data = json.load(f)
+            _config_cache[str(config_file)] = (stat.st_mtime_ns, stat.st_size, config_data)
+
+        # Create agent configuration
+        return AgentConfig(**config_data)
+
     def add_agent(self, agent_config: AgentConfig) -> None:
         """
         Manually add an agent to the swarm.
@@ -109,7 +194,14 @@ class SwarmOrchestrator:
         Execute a task using the assigned agents.
 
         Coordinates the execution of a task across multiple agents,
-        handling dependencies and passing results between agents.
+        handling dependencies and passing results between agents. Each step
+        may list the agents whose output it needs in "depends_on"; a step
+        without it waits for every earlier step, so a plain workflow runs in
+        order. Steps whose dependencies are done run together.
+
+        Each step is handed only the previous step's output, or the outputs
+        of its "depends_on" agents, so prompts don't grow with every step of
+        a long workflow.
 
         Args:
             task_config: Configuration describing the task to execute
@@ -119,49 +211,100 @@ class SwarmOrchestrator:
         """
         self.console.print(Panel(f"Executing Task: {task_config.name}", style="bold blue"))
 
-        task_results = {}
-        context = {}
-
-        # Execute workflow steps in order
-        for step in task_config.workflow:
-            agent_name = step.get("agent")
-            step_description = step.get("description", "")
-
-            if agent_name not in self.agents:
-                self.console.print(f"[red]Error: Agent '{agent_name}' not found[/red]")
-                continue
-
-            # Create a sub-task for this step
-            step_task = TaskConfig(
-                name=f"{task_config.name} - {step_description}",
-                description=step.get("instruction", step_description),
-                assigned_agents=[agent_name],
-                workflow=[],
-                expected_output=step.get("expected_output", "")
-            )
+        steps = task_config.workflow
+        names = [step.get("agent") for step in steps]
+        depends_on = {}
+        for i, step in enumerate(steps):
+            deps = step.get("depends_on", names[:i])
+            unknown = set(deps) - set(names)
+            if unknown:
+                raise ValueError(f"Step '{names[i]}' depends on unknown steps: {sorted(unknown)}")
+            depends_on[i] = set(deps)
 
-            self.console.print(f"[cyan]Step: {agent_name} - {step_description}[/cyan]")
-
-            # Execute the step with current context
-            result = await self.agents[agent_name].process_task(step_task, context)
-            task_results[agent_name] = result
-
-            # Add result to context for next agents
-            if result.success:
-                context[agent_name] = result.content
-                self.console.print(f"[green]✓ {agent_name} completed successfully[/green]")
-            else:
-                self.console.print(f"[red]✗ {agent_name} failed: {result.content}[/red]")
+        task_results = {}
+        outputs = {}
+        done = set()
+        pending = list(range(len(steps)))
+
+        while pending:
+            ready = [i for i in pending if depends_on[i] <= done]
+            if not ready:
+                raise ValueError(f"Workflow has a dependency cycle between: {[names[i] for i in pending]}")
+
+            # Start every ready step before waiting on any of them
+            results = await asyncio.gather(*(
+                self._run_step(task_config, steps[i], self._handoff_context(
+                    steps[i], outputs,
+                    next((name for name in reversed(names[:i]) if name in outputs), None)
+                ))
+                for i in ready
+            ))
+
+            for i, result in zip(ready, results):
+                if result is not None:
+                    task_results[names[i]] = result
+                    if result.success:
+                        outputs[names[i]] = result.content
+                done.add(names[i])
+            pending = [i for i in pending if i not in ready]
 
             # Optional delay between steps
-            if step.get("delay"):
-                await asyncio.sleep(step["delay"])
+            delay = max((steps[i].get("delay", 0) for i in ready), default=0)
+            if delay:
+                await asyncio.sleep(delay)
 
         # Store results
-        self.results[task_config.id] = list(task_results.values())
+        self.store_results(task_config.id, list(task_results.values()))
 
         return task_results
 
+    @staticmethod
+    def _handoff_context(step: Dict[str, Any], outputs: Dict[str, str],
+                         previous: Optional[str]) -> Dict[str, str]:
+        """
+        Select the earlier outputs a step is given as context.
+
+        That is the outputs of the agents in the step's "depends_on" list, or
+        otherwise just the output of the latest earlier step that succeeded.
+        """
+        names = step.get("depends_on", [previous] if previous else [])
+        return {name: outputs[name] for name in names if name in outputs}
+
+    async def _run_step(self, task_config: TaskConfig, step: Dict[str, Any],
+                        context: Dict[str, Any]) -> Optional[AgentResult]:
+        """
+        Run one workflow step on its agent with the given context.
+
+        Returns None if the step names an agent that is not loaded.
+        """
+        agent_name = step.get("agent")
+        step_description = step.get("description", "")
+
+        if agent_name not in self.agents:
+            self.console.print(f"[red]Error: Agent '{agent_name}' not found[/red]")
+            return None
+
+        # Create a sub-task for this step
+        step_task = TaskConfig(
+            name=f"{task_config.name} - {step_description}",
+            description=step.get("instruction", step_description),
+            assigned_agents=[agent_name],
+            workflow=[],
+            expected_output=step.get("expected_output", "")
+        )
+
+        self.console.print(f"[cyan]Step: {agent_name} - {step_description}[/cyan]")
+
+        # Execute the step with current context
+        result = await self.agents[agent_name].process_task(step_task, context)
+
+        if result.success:
+            self.console.print(f"[green]✓ {agent_name} completed successfully[/green]")
+        else:
+            self.console.print(f"[red]✗ {agent_name} failed: {result.content}[/red]")
+
+        return result
+
     async def execute_parallel_task(self, task_config: TaskConfig) -> Dict[str, AgentResult]:
         """
         Execute a task with agents working in parallel.
@@ -178,22 +321,23 @@ class SwarmOrchestrator:
         self.console.print(Panel(f"Executing Parallel Task: {task_config.name}", style="bold green"))
 
         # Create tasks for all assigned agents
-        agent_tasks = []
+        agent_names = []
         for agent_name in task_config.assigned_agents:
             if agent_name in self.agents:
-                agent_tasks.append(
-                    self.agents[agent_name].process_task(task_config)
-                )
+                agent_names.append(agent_name)
             else:
                 self.console.print(f"[red]Warning: Agent '{agent_name}' not found[/red]")
 
-        # Execute all tasks in parallel
-        results = await asyncio.gather(*agent_tasks, return_exceptions=True)
+        async def run_agent(agent_name: str):
+            try:
+                return agent_name, await self.agents[agent_name].process_task(task_config)
+            except Exception as e:
+                return agent_name, e
 
-        # Process results
+        # Execute all tasks in parallel, reporting each one as soon as it finishes
         task_results = {}
-        for i, result in enumerate(results):
-            agent_name = task_config.assigned_agents[i]
+        for finished in asyncio.as_completed([run_agent(agent_name) for agent_name in agent_names]):
+            agent_name, result = await finished
             if isinstance(result, Exception):
                 self.console.print(f"[red]Error in {agent_name}: {str(result)}[/red]")
             else:
@@ -203,11 +347,26 @@ class SwarmOrchestrator:
                 else:
                     self.console.print(f"[red]✗ {agent_name} failed[/red]")
 
+        # Keep the assigned order regardless of which agent finished first
+        task_results = {name: task_results[name] for name in agent_names if name in task_results}
+
         # Store results
-        self.results[task_config.id] = list(task_results.values())
+        self.store_results(task_config.id, list(task_results.values()))
 
         return task_results
 
+    def store_results(self, task_id: str, results: List[AgentResult]) -> None:
+        """
+        Keep a task's results for save_results.
+
+        Only the most recent max_stored_tasks tasks are kept, so a long-running
+        server doesn't hold every generated output forever.
+        """
+        self.results.pop(task_id, None)
+        self.results[task_id] = results
+        while len(self.results) > self.max_stored_tasks:
+            del self.results[next(iter(self.results))]
+
     def save_results(self, task_id: str, filename: str = None) -> str:
         """
         Save task results to a file.
@@ -229,25 +388,28 @@ class SwarmOrchestrator:
 
         filepath = Path("outputs") / filename
 
-        # Prepare results for JSON serialization
+        # Prepare results for JSON serialization; datetimes are written in ISO format
         results_data = {
             "task_id": task_id,
-            "timestamp": datetime.now().isoformat(),
-            "results": []
+            "timestamp": datetime.now(),
+            "results": [
+                {
+                    "agent_name": result.agent_name,
+                    "success": result.success,
+                    "content": result.content,
+                    "timestamp": result.timestamp,
+                    "metadata": result.metadata
+                }
+                for result in self.results[task_id]
+            ]
         }
 
-        for result in self.results[task_id]:
-            results_data["results"].append({
-                "agent_name": result.agent_name,
-                "success": result.success,
-                "content": result.content,
-                "timestamp": result.timestamp.isoformat(),
-                "metadata": result.metadata
-            })
-
-        # Save to file
-        with open(filepath, 'w') as f:
-            json.dump(results_data, f, indent=2)
+        # Save to file; orjson encodes straight to UTF-8 bytes
+        if orjson is not None:
+            filepath.write_bytes(orjson.dumps(results_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(filepath, 'w') as f:
+                json.dump(results_data, f, indent=2, default=datetime.isoformat)
 
         self.console.print(f"[green]Results saved to: {filepath}[/green]")
         return str(filepath)
@@ -299,41 +461,14 @@ class SwarmOrchestrator:
         Returns:
             TaskConfig ready for execution
         """
-        templates = {
-            "research_and_write": [
-                {"agent": "researcher", "description": "Research the topic",
-                 "instruction": f"Research {kwargs.get('topic', 'the assigned topic')} thoroughly"},
-                {"agent": "writer", "description": "Create content based on research",
-                 "instruction": f"Write a {kwargs.get('content_type', 'article')} based on the research"},
-                {"agent": "reviewer", "description": "Review and improve the content",
-                 "instruction": "Review the content for quality and suggest improvements"}
-            ],
-
-            "brainstorm_and_analyze": [
-                {"agent": "creative", "description": "Generate creative ideas",
-                 "instruction": f"Brainstorm creative solutions for {kwargs.get('problem', 'the given problem')}"},
-                {"agent": "analyzer", "description": "Analyze the feasibility of ideas",
-                 "instruction": "Analyze the proposed ideas for feasibility and potential impact"},
-                {"agent": "coordinator", "description": "Create implementation plan",
-                 "instruction": "Create a plan to implement the best ideas"}
-            ],
-
-            "content_pipeline": [
-                {"agent": "researcher", "description": "Gather information",
-                 "instruction": f"Research {kwargs.get('topic', 'the topic')} and gather relevant information"},
-                {"agent": "creative", "description": "Generate content ideas",
-                 "instruction": "Generate creative angles and approaches for the content"},
-                {"agent": "writer", "description": "Create the content",
-                 "instruction": f"Write engaging {kwargs.get('content_type', 'content')} incorporating the research and creative ideas"},
-                {"agent": "reviewer", "description": "Final review and polish",
-                 "instruction": "Review, edit, and polish the content for publication"}
-            ]
-        }
-
-        if template_name not in templates:
-            raise ValueError(f"Unknown template: {template_name}. Available: {list(templates.keys())}")
-
-        workflow = templates[template_name]
+        if template_name not in WORKFLOW_TEMPLATES:
+            raise ValueError(f"Unknown template: {template_name}. Available: {list(WORKFLOW_TEMPLATES.keys())}")
+
+        # Fill in only the chosen template's instructions
+        template = WORKFLOW_TEMPLATES[template_name]
+        params = {**template["defaults"], **kwargs}
+        workflow = [{**step, "instruction": step["instruction"].format_map(params)}
+                    for step in template["steps"]]
 
         return TaskConfig(
             name=kwargs.get('task_name', f"{template_name.replace('_', ' ').title()} Task"),
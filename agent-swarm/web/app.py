@@ -16,13 +16,22 @@ from flask_socketio import SocketIO, emit
 import threading
 import time
 
+try:
+    import uvloop
+except ImportError:  # optional; the default asyncio loop works the same
+    uvloop = None
+
 # Add parent directory to path to import swarm modules
 sys.path.append(str(Path(__file__).parent.parent))
 
 from swarm_orchestrator import SwarmOrchestrator
-from agent_base import TaskConfig, AgentConfig
+from agent_base import TaskConfig, AgentConfig, close_openai_client
 from agent_types import create_agent
 
+def new_event_loop() -> asyncio.AbstractEventLoop:
+    """Create an event loop for running swarm coroutines in a worker thread, using uvloop if installed."""
+    return uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+
 class GPSwarmWeb:
     """
     Web interface for visualizing and controlling the agent swarm.
@@ -194,7 +203,7 @@ class GPSwarmWeb:
         """Execute task with real-time WebSocket updates."""
         try:
             # Create new event loop for this thread
-            loop = asyncio.new_event_loop()
+            loop = new_event_loop()
             asyncio.set_event_loop(loop)
 
             # Notify task started
@@ -240,9 +249,9 @@ class GPSwarmWeb:
 
                 results[agent_name] = result
 
-                # Update context for next agents
+                # Hand only this output to the next agent
                 if result.success:
-                    context[agent_name] = result.content
+                    context = {agent_name: result.content}
 
                 # Notify step completed
                 self.socketio.emit('step_completed', {
@@ -258,7 +267,7 @@ class GPSwarmWeb:
                 time.sleep(1)
 
             # Task completed
-            self.orchestrator.results[task.id] = list(results.values())
+            self.orchestrator.store_results(task.id, list(results.values()))
 
             # Save results
             filename = self.orchestrator.save_results(task.id)
@@ -293,6 +302,7 @@ class GPSwarmWeb:
             self.current_task = None
 
         finally:
+            loop.run_until_complete(close_openai_client())
             loop.close()
 
     def _create_product_launch_task(self, product):
@@ -386,8 +396,7 @@ class GPSwarmWeb:
         print(f"Loading agents from configuration files...")
 
         # Load agents synchronously for startup
-        import asyncio
-        loop = asyncio.new_event_loop()
+        loop = new_event_loop()
         asyncio.set_event_loop(loop)
         loop.run_until_complete(self.load_agents())
         loop.close()